@@ -17,6 +17,7 @@ from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQu
 from src.database.models import DatabaseManager
 from src.telegram_handlers.handlers import TaskBotHandlers
 from src.telegram_handlers.callback_handlers import CallbackHandler
+from src.telegram_handlers.rate_limiter import TokenBucket
 from src.reminders.scheduler import ReminderScheduler
 from src.reminders.smart_scheduler import SmartReminderScheduler
 from src.config.manager import ConfigManager
@@ -60,9 +61,12 @@ class ModularTaskBot:
                 send_reminder_callback=self.send_reminder
             )
 
+        # Один лимит исходящих запросов на весь бот: ответы, callback и напоминания
+        self.send_bucket = TokenBucket(rate=30, capacity=30)
+
         # Инициализация handlers с передачей scheduler
-        self.handlers = TaskBotHandlers(self.db, self.reminder_scheduler)
-        self.callback_handler = CallbackHandler(self.db, self.reminder_scheduler)
+        self.handlers = TaskBotHandlers(self.db, self.reminder_scheduler, self.send_bucket)
+        self.callback_handler = CallbackHandler(self.db, self.reminder_scheduler, self.send_bucket)
 
         # Telegram Application
         self.app = None
@@ -71,7 +75,8 @@ class ModularTaskBot:
         """Колбэк для отправки напоминаний"""
         try:
             if self.app:
-                await self.app.bot.send_message(
+                await self.send_bucket.call(
+                    self.app.bot.send_message,
                     chat_id=user_id,
                     text=message,
                     parse_mode='Markdown'
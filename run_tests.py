@@ -9,6 +9,8 @@
     python run_tests.py -v           # Verbose режим
     python run_tests.py --coverage   # С coverage отчётом
     python run_tests.py --html       # HTML отчёт coverage
+    python run_tests.py --fast       # Без переписывания assert (для замеров скорости в CI)
+    python run_tests.py -n auto      # Параллельно через pytest-xdist
 """
 
 import sys
@@ -57,6 +59,18 @@ def main():
         help='Rerun only failed tests from last run'
     )
 
+    parser.add_argument(
+        '--fast',
+        action='store_true',
+        help='Plain asserts without rewriting (less detailed failures; for perf runs)'
+    )
+
+    parser.add_argument(
+        '-n', '--workers',
+        metavar='N',
+        help='Run tests in parallel with pytest-xdist (number or "auto")'
+    )
+
     args = parser.parse_args()
 
     # Базовая команда pytest
@@ -95,6 +109,14 @@ def main():
     if args.failed:
         cmd.append('--lf')
 
+    # Без переписывания assert - быстрее сбор, но менее подробные сообщения об ошибках
+    if args.fast:
+        cmd.append('--assert=plain')
+
+    # Параллельный запуск: каждый воркер - отдельный процесс со своей БД в памяти
+    if args.workers:
+        cmd.extend(['-n', args.workers])
+
     # Добавляем цветной вывод
     cmd.append('--color=yes')
 
@@ -1,8 +1,13 @@
+import asyncio
+import copy
 import json
 import os
+import hashlib
 import tempfile
-from datetime import datetime
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from datetime import datetime, date
+from typing import Dict, Any, Optional, Tuple
 import google.generativeai as genai
 
 # Попытка импорта pydub с обработкой ошибки для Python 3.13+
@@ -14,14 +19,52 @@ except (ImportError, ModuleNotFoundError) as e:
     AUDIO_PROCESSING_AVAILABLE = False
     AudioSegment = None
 
+# Максимальное количество закэшированных транскрипций
+_VOICE_CACHE_SIZE = 256
+
+# Максимальное количество закэшированных результатов разбора текста задач
+_TASK_CACHE_SIZE = 1024
+
+
+def _normalize_task_text(text: str) -> str:
+    """Ключ кэша: нижний регистр, пробельные символы схлопнуты в один пробел"""
+    return ' '.join(text.lower().split())
+
 
 class GeminiProcessor:
     def __init__(self):
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+        api_key = os.getenv('GEMINI_API_KEY')
+        genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # Кэш транскрипций: хэш аудио -> текст (пересланные и повторные голосовые)
+        self._voice_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        # Кэш разбора текста: (дата, нормализованный текст) -> результат.
+        # Дата входит в ключ, т.к. "завтра" и дни недели зависят от текущего дня;
+        # результаты с конкретным временем не кэшируются
+        self._task_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        # process_task_text вызывается из потоков (asyncio.to_thread)
+        self._task_cache_lock = threading.Lock()
+
+        # Доступность голосовой обработки определяется ключом и не меняется во время работы
+        self._voice_available = bool(api_key)
+        if not self._voice_available:
+            self._voice_status_message = "❌ Недоступна (нет GEMINI_API_KEY)"
+        elif not AUDIO_PROCESSING_AVAILABLE:
+            self._voice_status_message = "✅ Доступна (Gemini Audio, без конвертации)"
+        else:
+            self._voice_status_message = "✅ Доступна (Gemini Audio с конвертацией)"
 
     def process_task_text(self, text: str) -> Dict[str, Any]:
         """Обработка текста задачи через Gemini с извлечением всех параметров"""
+        key = (date.today().isoformat(), _normalize_task_text(text))
+        with self._task_cache_lock:
+            cached = self._task_cache.get(key)
+            if cached is not None:
+                self._task_cache.move_to_end(key)
+        if cached is not None:
+            # Копия - вызывающий код может изменять результат
+            return copy.deepcopy(cached)
+
         current_date = datetime.now().strftime("%Y-%m-%d")
         current_day = datetime.now().strftime("%A")
 
@@ -76,6 +119,14 @@ class GeminiProcessor:
                 except:
                     result['due_date'] = None
 
+            # Конкретное время может быть вычислено относительно текущего момента
+            # ("через 2 часа") - такой результат нельзя переиспользовать в течение дня
+            if not (result.get('has_specific_time') or result.get('due_time') or result.get('reminder_time')):
+                with self._task_cache_lock:
+                    self._task_cache[key] = copy.deepcopy(result)
+                    if len(self._task_cache) > _TASK_CACHE_SIZE:
+                        self._task_cache.popitem(last=False)
+
             return result
 
         except Exception as e:
@@ -236,18 +287,52 @@ class GeminiProcessor:
             print(f"Error type: {type(e)}")
             return None
 
+    async def process_voice_bytes(self, data: bytes, mime_type: str = "audio/ogg") -> Optional[str]:
+        """Обработка голосового сообщения из памяти (без временных файлов)"""
+        key = hashlib.blake2b(data, digest_size=16).digest()
+        cached = self._voice_cache.get(key)
+        if cached is not None:
+            self._voice_cache.move_to_end(key)
+            return cached
+
+        print(f"Processing voice bytes: {len(data)} bytes, {mime_type}")
+
+        try:
+            prompt = """
+            Транскрибируй это аудио сообщение.
+            Верни ТОЛЬКО текст того, что было сказано, без дополнительных комментариев.
+            Если язык русский - транскрибируй на русском.
+            """
+
+            # Короткие голосовые сообщения передаем inline, без upload_file/delete_file.
+            # Запрос блокирующий - выполняем в потоке, чтобы не останавливать event loop
+            response = await asyncio.to_thread(
+                self.model.generate_content, [prompt, {"mime_type": mime_type, "data": data}]
+            )
+            text = response.text.strip() if response.text else ""
+            print(f"Transcription result: '{text}'")
+
+            if not text:
+                return None
+
+            self._voice_cache[key] = text
+            if len(self._voice_cache) > _VOICE_CACHE_SIZE:
+                self._voice_cache.popitem(last=False)
+
+            return text
+
+        except Exception as e:
+            print(f"Ошибка при обработке голосового сообщения через Gemini: {e}")
+            print(f"Error type: {type(e)}")
+            return None
+
     def is_voice_processing_available(self) -> bool:
         """Проверка доступности обработки голосовых сообщений через Gemini"""
-        return bool(os.getenv('GEMINI_API_KEY'))
+        return self._voice_available
 
     def get_voice_status_message(self) -> str:
         """Получить сообщение о статусе голосовой обработки"""
-        if not os.getenv('GEMINI_API_KEY'):
-            return "❌ Недоступна (нет GEMINI_API_KEY)"
-        elif not AUDIO_PROCESSING_AVAILABLE:
-            return "✅ Доступна (Gemini Audio, без конвертации)"
-        else:
-            return "✅ Доступна (Gemini Audio с конвертацией)"
+        return self._voice_status_message
 
     def _get_fallback_result(self, text: str) -> Dict[str, Any]:
         """Базовый результат при ошибке Gemini"""
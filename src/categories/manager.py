@@ -1,20 +1,32 @@
+from datetime import date
 from typing import List, Tuple, Optional
 from src.database.models import DatabaseManager
 
+# Иконки стандартных категорий
+DEFAULT_CATEGORIES = {
+    'работа': '🔷',
+    'дом': '🏠',
+    'личное': '👤',
+    'учеба': '📚',
+    'здоровье': '🏥',
+    'покупки': '🛒',
+    'спорт': '⚽',
+    'проекты': '🚀'
+}
+
+# Эмодзи приоритетов
+_PRIORITY_EMOJI = {
+    'high': '🔴',
+    'medium': '🟡',
+    'low': '🟢'
+}
+
 
 class CategoryManager:
+    default_categories = DEFAULT_CATEGORIES
+
     def __init__(self, db: DatabaseManager):
         self.db = db
-        self.default_categories = {
-            'работа': '🔷',
-            'дом': '🏠',
-            'личное': '👤',
-            'учеба': '📚',
-            'здоровье': '🏥',
-            'покупки': '🛒',
-            'спорт': '⚽',
-            'проекты': '🚀'
-        }
 
     def get_or_create_category(self, user_id: int, category_name: str) -> Optional[str]:
         """Получить или создать категорию"""
@@ -49,7 +61,7 @@ class CategoryManager:
         color = self.default_categories.get(category_name.lower(), '📁')
         return f"{color} {category_name.title()}"
 
-    def format_tasks_by_category(self, tasks: List[tuple]) -> str:
+    def format_tasks_by_category(self, tasks: List[tuple], user_id: Optional[int] = None) -> str:
         """Форматировать задачи по категориям"""
         if not tasks:
             return "📭 Задач нет"
@@ -67,37 +79,38 @@ class CategoryManager:
             else:
                 uncategorized_tasks.append((task_id, title, priority, due_date))
 
-        message = ""
+        # Категории пользователя - одним запросом на весь список
+        display_map = {}
+        if user_id is not None:
+            display_map = {
+                name.lower(): f"{color} {name.title()}"
+                for _cat_id, name, color in self.db.get_user_categories(user_id)
+            }
+
+        lines = []
 
         # Выводим задачи по категориям
         for category, category_tasks in sorted(categorized_tasks.items()):
-            category_display = self.get_category_display_name(0, category)  # user_id нужно передавать
-            message += f"\n*{category_display}:*\n"
-
-            for task_id, title, priority, due_date in category_tasks:
-                priority_emoji = self._get_priority_emoji(priority)
-                date_text = ""
-                if due_date:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(due_date, '%Y-%m-%d')
-                    date_text = f" ({date_obj.strftime('%d.%m')})"
-
-                message += f"{priority_emoji} #{task_id} {title}{date_text}\n"
+            category_display = display_map.get(category.lower())
+            if category_display is None:
+                color = self.default_categories.get(category.lower(), '📁')
+                category_display = f"{color} {category.title()}"
+            lines.append(f"\n*{category_display}:*")
+            lines.extend(self._format_task_line(*task) for task in category_tasks)
 
         # Задачи без категории
         if uncategorized_tasks:
-            message += "\n*📁 Без категории:*\n"
-            for task_id, title, priority, due_date in uncategorized_tasks:
-                priority_emoji = self._get_priority_emoji(priority)
-                date_text = ""
-                if due_date:
-                    from datetime import datetime
-                    date_obj = datetime.strptime(due_date, '%Y-%m-%d')
-                    date_text = f" ({date_obj.strftime('%d.%m')})"
+            lines.append("\n*📁 Без категории:*")
+            lines.extend(self._format_task_line(*task) for task in uncategorized_tasks)
 
-                message += f"{priority_emoji} #{task_id} {title}{date_text}\n"
+        return "\n".join(lines).strip()
 
-        return message.strip()
+    def _format_task_line(self, task_id: int, title: str, priority: str, due_date: Optional[str]) -> str:
+        """Строка задачи: эмодзи приоритета, номер, название и дата"""
+        date_text = ""
+        if due_date:
+            date_text = f" ({date.fromisoformat(due_date).strftime('%d.%m')})"
+        return f"{self._get_priority_emoji(priority)} #{task_id} {title}{date_text}"
 
     def get_categories_list(self, user_id: int) -> str:
         """Получить список категорий пользователя"""
@@ -115,11 +128,7 @@ class CategoryManager:
 
     def _get_priority_emoji(self, priority: str) -> str:
         """Получить эмодзи для приоритета"""
-        return {
-            'high': '🔴',
-            'medium': '🟡',
-            'low': '🟢'
-        }.get(priority, '🟡')
+        return _PRIORITY_EMOJI.get(priority, '🟡')
 
     def create_user_category(self, user_id: int, category_name: str, color: str = None) -> bool:
         """Создать пользовательскую категорию"""
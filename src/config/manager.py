@@ -1,11 +1,89 @@
 import os
+import copy
 import yaml
+from functools import lru_cache, cached_property
 from typing import Dict, Any, List
 from pathlib import Path
 
+# C-загрузчик libyaml, если PyYAML собран с ним; иначе чистый Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# JSON - подмножество YAML; конфиг в JSON разбираем быстрым парсером, если он есть
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Разбор YAML файла; mtime и размер в ключе - изменённый файл разбирается заново"""
+    # Файл небольшой - читаем целиком и отдаём парсеру один буфер
+    text = Path(path).read_text(encoding='utf-8')
+    if text.lstrip()[:1] in ('{', '['):
+        try:
+            return _json_loads(text)
+        except ValueError:
+            # Flow-стиль YAML, не являющийся JSON
+            pass
+    return yaml.load(text, Loader=_YamlLoader)
+
+
+# Конфигурация по умолчанию - строится один раз при импорте.
+# Общая для всего процесса: наружу отдаются только глубокие копии
+_DEFAULT_CONFIG = {
+    'reminders': {
+        'scheduler': {
+            'type': 'smart',
+            'initial_lookahead_hours': 72,
+            'daily_reload_window': [48, 72],
+            'cleanup_time': '23:55',
+            'config_reload_time': '03:00',
+            'old_reminders_retention_days': 7
+        },
+        'check_interval': 3600,  # Для обратной совместимости
+        'deadline_reminders': [
+            {'days_before': 2, 'time': '09:00'},
+            {'days_before': 1, 'time': '18:00'},
+            {'days_before': 0, 'time': '10:00'},
+            {'days_before': 0, 'time': '16:00'}
+        ],
+        'time_based_reminders': {
+            'enabled': True,
+            'hours_before': [3, 1],
+            'minutes_before': []
+        },
+        'condition_checks': {
+            'default_interval': 86400,
+            'default_time': '10:00'
+        },
+        'morning_reminders': {
+            'enabled': True,
+            'time': '09:00'
+        }
+    },
+    'general': {
+        'timezone': 'Europe/Moscow',
+        'min_reminder_interval': 60
+    }
+}
+
 
 class ConfigManager:
-    """Менеджер конфигурации для Task Manager Bot"""
+    """
+    Менеджер конфигурации для Task Manager Bot
+
+    Значения get_* вычисляются из config один раз и кэшируются. Изменения
+    config на месте (config['reminders'][...] = ...) в них не попадают -
+    новую конфигурацию нужно присвоить целиком через manager.config = ...
+    или перечитать файл через reload_config().
+    """
+
+    # Секции вычисляются лениво при первом обращении и кэшируются до смены config
+    _SECTIONS = ('_reminders_section', '_general_section', '_time_based_section', '_scheduler_section')
 
     def __init__(self, config_path: str = None):
         if config_path is None:
@@ -15,128 +93,157 @@ class ConfigManager:
         self.config_path = config_path
         self.config = self._load_config()
 
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        Текущая конфигурация
+
+        Изменять её на месте нельзя: закэшированные секции не сбрасываются.
+        Для изменений присвойте новый словарь (например, изменённую копию).
+        """
+        return self._config
+
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        # Новая конфигурация - сбрасываем вычисленные секции
+        self._config = value
+        for name in self._SECTIONS:
+            self.__dict__.pop(name, None)
+
+    @cached_property
+    def _reminders_section(self) -> Dict[str, Any]:
+        """Общие настройки напоминаний"""
+        reminders = self._config.get('reminders', {})
+        condition_checks = reminders.get('condition_checks', {})
+        morning_reminders = reminders.get('morning_reminders', {})
+        return {
+            'check_interval': reminders.get('check_interval', 3600),
+            'deadline_reminders': reminders.get('deadline_reminders', []),
+            'condition_check_interval': condition_checks.get('default_interval', 86400),
+            'condition_check_time': condition_checks.get('default_time', '10:00'),
+            'morning_reminder_time': morning_reminders.get('time', '09:00'),
+            'morning_reminders_enabled': morning_reminders.get('enabled', True),
+        }
+
+    @cached_property
+    def _general_section(self) -> Dict[str, Any]:
+        """Секция general"""
+        general = self._config.get('general', {})
+        return {
+            'timezone': general.get('timezone', 'Europe/Moscow'),
+            'min_reminder_interval': general.get('min_reminder_interval', 60),
+        }
+
+    @cached_property
+    def _time_based_section(self) -> Dict[str, Any]:
+        """Напоминания для задач с точным временем"""
+        config = self._config.get('reminders', {}).get('time_based_reminders', {
+            'enabled': True,
+            'hours_before': [3, 1],
+            'minutes_before': []
+        })
+        return {
+            'config': config,
+            'enabled': config.get('enabled', True),
+            'hours_before': config.get('hours_before', [3, 1]),
+            'minutes_before': config.get('minutes_before', []),
+        }
+
+    @cached_property
+    def _scheduler_section(self) -> Dict[str, Any]:
+        """Настройки планировщика"""
+        reminders = self._config.get('reminders', {})
+        return {
+            'type': reminders.get('scheduler', {}).get('type', 'smart'),
+            'config': reminders.get('scheduler', {
+                'type': 'smart',
+                'initial_lookahead_hours': 72,
+                'daily_reload_window': [48, 72],
+                'cleanup_time': '23:55',
+                'config_reload_time': '03:00',
+                'old_reminders_retention_days': 7
+            }),
+        }
+
     def _load_config(self) -> Dict[str, Any]:
         """Загрузка конфигурации из YAML файла"""
         try:
             if not os.path.exists(self.config_path):
                 print(f"Warning: Config file not found at {self.config_path}, using defaults")
-                return self._get_default_config()
+                return copy.deepcopy(_DEFAULT_CONFIG)
 
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                return config if config else self._get_default_config()
+            stat = os.stat(self.config_path)
+            config = _parse_yaml_cached(os.path.abspath(self.config_path), stat.st_mtime_ns, stat.st_size)
+            # Глубокая копия - результат разбора общий для всех экземпляров и кэша
+            return copy.deepcopy(config) if config else copy.deepcopy(_DEFAULT_CONFIG)
 
         except Exception as e:
             print(f"Error loading config: {e}, using defaults")
-            return self._get_default_config()
+            return copy.deepcopy(_DEFAULT_CONFIG)
 
     def _get_default_config(self) -> Dict[str, Any]:
-        """Конфигурация по умолчанию"""
-        return {
-            'reminders': {
-                'scheduler': {
-                    'type': 'smart',
-                    'initial_lookahead_hours': 72,
-                    'daily_reload_window': [48, 72],
-                    'cleanup_time': '23:55',
-                    'config_reload_time': '03:00',
-                    'old_reminders_retention_days': 7
-                },
-                'check_interval': 3600,  # Для обратной совместимости
-                'deadline_reminders': [
-                    {'days_before': 2, 'time': '09:00'},
-                    {'days_before': 1, 'time': '18:00'},
-                    {'days_before': 0, 'time': '10:00'},
-                    {'days_before': 0, 'time': '16:00'}
-                ],
-                'time_based_reminders': {
-                    'enabled': True,
-                    'hours_before': [3, 1],
-                    'minutes_before': []
-                },
-                'condition_checks': {
-                    'default_interval': 86400,
-                    'default_time': '10:00'
-                },
-                'morning_reminders': {
-                    'enabled': True,
-                    'time': '09:00'
-                }
-            },
-            'general': {
-                'timezone': 'Europe/Moscow',
-                'min_reminder_interval': 60
-            }
-        }
+        """Конфигурация по умолчанию (копия - изменения не затрагивают другие экземпляры)"""
+        return copy.deepcopy(_DEFAULT_CONFIG)
 
     def get_check_interval(self) -> int:
         """Получить интервал проверки планировщика (в секундах)"""
-        return self.config.get('reminders', {}).get('check_interval', 3600)
+        return self._reminders_section['check_interval']
 
     def get_deadline_reminders(self) -> List[Dict[str, Any]]:
         """Получить список настроек напоминаний о дедлайнах"""
-        return self.config.get('reminders', {}).get('deadline_reminders', [])
+        return self._reminders_section['deadline_reminders']
 
     def get_condition_check_interval(self) -> int:
         """Получить интервал проверки условий (в секундах)"""
-        return self.config.get('reminders', {}).get('condition_checks', {}).get('default_interval', 86400)
+        return self._reminders_section['condition_check_interval']
 
     def get_condition_check_time(self) -> str:
         """Получить время проверки условий"""
-        return self.config.get('reminders', {}).get('condition_checks', {}).get('default_time', '10:00')
+        return self._reminders_section['condition_check_time']
 
     def get_morning_reminder_time(self) -> str:
         """Получить время утренних напоминаний"""
-        return self.config.get('reminders', {}).get('morning_reminders', {}).get('time', '09:00')
+        return self._reminders_section['morning_reminder_time']
 
     def is_morning_reminders_enabled(self) -> bool:
         """Проверить, включены ли утренние напоминания"""
-        return self.config.get('reminders', {}).get('morning_reminders', {}).get('enabled', True)
+        return self._reminders_section['morning_reminders_enabled']
 
     def get_timezone(self) -> str:
         """Получить временную зону"""
-        return self.config.get('general', {}).get('timezone', 'Europe/Moscow')
+        return self._general_section['timezone']
 
     def get_min_reminder_interval(self) -> int:
         """Получить минимальный интервал между напоминаниями (в минутах)"""
-        return self.config.get('general', {}).get('min_reminder_interval', 60)
+        return self._general_section['min_reminder_interval']
 
     def get_time_based_reminders_config(self) -> Dict[str, Any]:
         """Получить конфигурацию напоминаний для задач с точным временем"""
-        return self.config.get('reminders', {}).get('time_based_reminders', {
-            'enabled': True,
-            'hours_before': [3, 1],
-            'minutes_before': []
-        })
+        return self._time_based_section['config']
 
     def is_time_based_reminders_enabled(self) -> bool:
         """Проверить, включены ли напоминания для задач с точным временем"""
-        return self.get_time_based_reminders_config().get('enabled', True)
+        return self._time_based_section['enabled']
 
     def get_time_based_hours_before(self) -> List[int]:
         """Получить список интервалов (в часах) для напоминаний с точным временем"""
-        return self.get_time_based_reminders_config().get('hours_before', [3, 1])
+        return self._time_based_section['hours_before']
 
     def get_time_based_minutes_before(self) -> List[int]:
         """Получить список интервалов (в минутах) для напоминаний с точным временем"""
-        return self.get_time_based_reminders_config().get('minutes_before', [])
+        return self._time_based_section['minutes_before']
 
     def get_scheduler_type(self) -> str:
         """Получить тип планировщика (smart или polling)"""
-        return self.config.get('reminders', {}).get('scheduler', {}).get('type', 'smart')
+        return self._scheduler_section['type']
 
     def get_scheduler_config(self) -> Dict[str, Any]:
         """Получить полную конфигурацию планировщика"""
-        return self.config.get('reminders', {}).get('scheduler', {
-            'type': 'smart',
-            'initial_lookahead_hours': 72,
-            'daily_reload_window': [48, 72],
-            'cleanup_time': '23:55',
-            'config_reload_time': '03:00',
-            'old_reminders_retention_days': 7
-        })
+        return self._scheduler_section['config']
 
     def reload_config(self):
         """Перезагрузить конфигурацию из файла"""
+        # Явная перезагрузка всегда читает файл, даже если mtime не изменился
+        _parse_yaml_cached.cache_clear()
         self.config = self._load_config()
         print("Configuration reloaded successfully")
@@ -5,115 +5,96 @@ from typing import List, Optional, Dict, Any
 
 
 class DatabaseManager:
-    def __init__(self, db_path: str = 'tasks.db'):
+    """
+    Хранилище задач, напоминаний и категорий в SQLite
+
+    По умолчанию файл БД использует стандартный журнал SQLite (rollback journal).
+    С wal=True включается режим WAL: читатели не блокируют писателя, но рядом
+    с файлом БД остаются файлы <db>-wal и <db>-shm, которые нужно копировать
+    вместе с ним. Режим WAL сохраняется в самом файле БД.
+    """
+
+    # Размер кэша подготовленных запросов (все запросы - литералы с параметрами)
+    CACHED_STATEMENTS = 512
+
+    def __init__(self, db_path: str = 'tasks.db', wal: bool = False):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn = sqlite3.connect(
+            db_path, check_same_thread=False, cached_statements=self.CACHED_STATEMENTS
+        )
+        if wal and db_path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
         self.setup_database()
 
-    def setup_database(self):
-        cursor = self.conn.cursor()
+    # Схема БД: выполняется одним executescript
+    _SCHEMA_SQL = '''
+        -- Обновленная схема БД с новыми полями
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            raw_text TEXT,
+            title TEXT,
+            description TEXT,
+            conditions TEXT,
+            priority TEXT,
+            due_date DATE,
+            reminder_time DATETIME,
+            category TEXT,
+            tags TEXT,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_condition_check TIMESTAMP,
+            condition_check_interval INTEGER DEFAULT 86400
+        );
+
+        -- Таблица для напоминаний
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER,
+            user_id INTEGER,
+            reminder_time DATETIME,
+            reminder_type TEXT,
+            is_sent BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (task_id) REFERENCES tasks (id)
+        );
+
+        -- Таблица для категорий
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            name TEXT,
+            color TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    '''
+
+    # Индексы для ускорения запросов
+    _INDEXES_SQL = '''
+        -- Индексы для таблицы tasks
+        CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks(user_id, status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(user_id, category);
+        -- Частичный индекс только по активным задачам (выполненные не раздувают его)
+        CREATE INDEX IF NOT EXISTS idx_tasks_active_user_due ON tasks(user_id, due_date) WHERE status = 'active';
+
+        -- Индексы для таблицы reminders
+        CREATE INDEX IF NOT EXISTS idx_reminders_user_id ON reminders(user_id);
+        CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders(reminder_time, is_sent);
+        CREATE INDEX IF NOT EXISTS idx_reminders_task ON reminders(task_id);
+
+        -- Индексы для таблицы categories
+        CREATE INDEX IF NOT EXISTS idx_categories_user_id ON categories(user_id);
+    '''
 
-        # Обновленная схема БД с новыми полями
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                raw_text TEXT,
-                title TEXT,
-                description TEXT,
-                conditions TEXT,
-                priority TEXT,
-                due_date DATE,
-                reminder_time DATETIME,
-                category TEXT,
-                tags TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_condition_check TIMESTAMP,
-                condition_check_interval INTEGER DEFAULT 86400
-            )
-        ''')
-
-        # Миграция: добавление недостающих столбцов
+    def setup_database(self):
+        # tasks создаётся до миграции, индексы - после (им нужны добавленные столбцы)
+        self.conn.executescript(self._SCHEMA_SQL)
         self._migrate_tasks_table()
-
-        # Таблица для напоминаний
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER,
-                user_id INTEGER,
-                reminder_time DATETIME,
-                reminder_type TEXT,
-                is_sent BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (task_id) REFERENCES tasks (id)
-            )
-        ''')
-
-        # Таблица для категорий
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                name TEXT,
-                color TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Создание индексов для оптимизации запросов
-        self._create_indexes()
-
+        self.conn.executescript(self._INDEXES_SQL)
         self.conn.commit()
 
-    def _create_indexes(self):
-        """Создание индексов для ускорения запросов"""
-        cursor = self.conn.cursor()
-
-        # Индексы для таблицы tasks
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_tasks_user_id
-            ON tasks(user_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_tasks_user_status
-            ON tasks(user_id, status)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_tasks_due_date
-            ON tasks(due_date)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_tasks_category
-            ON tasks(user_id, category)
-        ''')
-
-        # Индексы для таблицы reminders
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_reminders_user_id
-            ON reminders(user_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_reminders_time
-            ON reminders(reminder_time, is_sent)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_reminders_task
-            ON reminders(task_id)
-        ''')
-
-        # Индексы для таблицы categories
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_categories_user_id
-            ON categories(user_id)
-        ''')
-
     def _migrate_tasks_table(self):
         """Миграция таблицы tasks - добавление недостающих столбцов"""
         cursor = self.conn.cursor()
@@ -141,15 +122,17 @@ class DatabaseManager:
 
         self.conn.commit()
 
-    def save_task(self, user_id: int, raw_text: str, structured: Dict[str, Any]) -> int:
-        """Сохранение задачи в БД"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO tasks (
-                user_id, raw_text, title, description, conditions,
-                priority, due_date, category, tags
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    _INSERT_TASK_SQL = '''
+        INSERT INTO tasks (
+            user_id, raw_text, title, description, conditions,
+            priority, due_date, category, tags
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    @staticmethod
+    def _task_params(user_id: int, raw_text: str, structured: Dict[str, Any]) -> tuple:
+        """Параметры INSERT для задачи"""
+        return (
             user_id,
             raw_text,
             structured['title'],
@@ -159,10 +142,38 @@ class DatabaseManager:
             structured.get('due_date'),
             structured.get('category'),
             json.dumps(structured.get('tags', []), ensure_ascii=False)
-        ))
+        )
+
+    def _now(self) -> datetime:
+        """Текущее время (отдельный метод, чтобы тесты могли его подменить)"""
+        return datetime.now()
+
+    def save_task(self, user_id: int, raw_text: str, structured: Dict[str, Any]) -> int:
+        """Сохранение задачи в БД"""
+        cursor = self.conn.cursor()
+        cursor.execute(self._INSERT_TASK_SQL, self._task_params(user_id, raw_text, structured))
         self.conn.commit()
         return cursor.lastrowid
 
+    def save_tasks_bulk(self, user_id: int, specs: List[tuple]) -> List[int]:
+        """
+        Сохранить несколько задач одной транзакцией.
+
+        Args:
+            user_id: ID пользователя
+            specs: Список кортежей (raw_text, structured)
+
+        Returns:
+            ID созданных задач в том же порядке, что и specs
+        """
+        cursor = self.conn.cursor()
+        task_ids = []
+        with self.conn:
+            for raw_text, structured in specs:
+                cursor.execute(self._INSERT_TASK_SQL, self._task_params(user_id, raw_text, structured))
+                task_ids.append(cursor.lastrowid)
+        return task_ids
+
     def get_tasks_by_date(self, user_id: int, date: str) -> List[tuple]:
         """Получить задачи по дате"""
         cursor = self.conn.cursor()
@@ -217,6 +228,26 @@ class DatabaseManager:
         ''', (user_id, category))
         return cursor.fetchall()
 
+    def get_tasks_by_category_with_display(self, user_id: int, category: str) -> List[tuple]:
+        """
+        Получить задачи по категории вместе с иконкой категории одним запросом
+
+        Returns:
+            Список (id, title, priority, due_date, category_color);
+            category_color = None, если категория не создана у пользователя
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT t.id, t.title, t.priority, t.due_date,
+                   (SELECT c.color FROM categories c
+                    WHERE c.user_id = t.user_id AND c.name = t.category
+                    LIMIT 1) AS category_color
+            FROM tasks t
+            WHERE t.user_id = ? AND t.status = 'active' AND t.category = ?
+            ORDER BY t.due_date, t.priority
+        ''', (user_id, category))
+        return cursor.fetchall()
+
     def mark_task_done(self, task_id: int, user_id: int) -> bool:
         """Отметить задачу выполненной"""
         cursor = self.conn.cursor()
@@ -231,7 +262,7 @@ class DatabaseManager:
     def get_tasks_for_condition_check(self) -> List[tuple]:
         """Получить задачи для проверки условий"""
         cursor = self.conn.cursor()
-        current_time = datetime.now()
+        current_time = self._now()
         cursor.execute('''
             SELECT id, user_id, title, conditions, last_condition_check, condition_check_interval
             FROM tasks
@@ -264,10 +295,31 @@ class DatabaseManager:
         ''', (task_id, user_id, reminder_time, reminder_type))
         self.conn.commit()
 
+    def add_reminders_bulk(self, rows: List[tuple]) -> List[int]:
+        """
+        Добавить несколько напоминаний одной транзакцией.
+
+        Args:
+            rows: Список кортежей (task_id, user_id, reminder_time, reminder_type)
+
+        Returns:
+            ID созданных напоминаний в том же порядке, что и rows
+        """
+        cursor = self.conn.cursor()
+        reminder_ids = []
+        with self.conn:
+            for row in rows:
+                cursor.execute('''
+                    INSERT INTO reminders (task_id, user_id, reminder_time, reminder_type)
+                    VALUES (?, ?, ?, ?)
+                ''', row)
+                reminder_ids.append(cursor.lastrowid)
+        return reminder_ids
+
     def get_pending_reminders(self) -> List[tuple]:
         """Получить неотправленные напоминания"""
         cursor = self.conn.cursor()
-        current_time = datetime.now()
+        current_time = self._now()
         cursor.execute('''
             SELECT r.id, r.task_id, r.user_id, t.title, r.reminder_type
             FROM reminders r
@@ -300,7 +352,7 @@ class DatabaseManager:
             List of tuples: (id, task_id, user_id, title, reminder_type, reminder_time)
         """
         cursor = self.conn.cursor()
-        now = datetime.now()
+        now = self._now()
         start_time = now + timedelta(hours=from_hours)
         end_time = now + timedelta(hours=hours)
 
@@ -328,7 +380,7 @@ class DatabaseManager:
             Количество удалённых записей
         """
         cursor = self.conn.cursor()
-        cutoff_time = datetime.now() - timedelta(days=days_old)
+        cutoff_time = self._now() - timedelta(days=days_old)
 
         cursor.execute('''
             DELETE FROM reminders
@@ -420,7 +472,7 @@ class DatabaseManager:
             WHERE user_id = ? AND status = 'active'
             GROUP BY priority
         ''', (user_id,))
-        stats['tasks_by_priority'] = {row[0]: row[1] for row in cursor.fetchall()}
+        stats['tasks_by_priority'] = dict(cursor)
 
         # Разбивка по категориям (только активные)
         cursor.execute('''
@@ -429,7 +481,7 @@ class DatabaseManager:
             WHERE user_id = ? AND status = 'active' AND category IS NOT NULL
             GROUP BY category
         ''', (user_id,))
-        stats['tasks_by_category'] = {row[0]: row[1] for row in cursor.fetchall()}
+        stats['tasks_by_category'] = dict(cursor)
 
         # Активные напоминания
         cursor.execute('''
@@ -440,7 +492,7 @@ class DatabaseManager:
         stats['active_reminders'] = cursor.fetchone()[0]
 
         # Просроченные задачи
-        today = datetime.now().date()
+        today = self._now().date()
         cursor.execute('''
             SELECT COUNT(*)
             FROM tasks
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta, time
-from typing import List, Callable, Awaitable
+from typing import List, Tuple, Callable, Awaitable
 from src.database.models import DatabaseManager
 from src.config.manager import ConfigManager
 
@@ -12,6 +12,7 @@ class ReminderScheduler:
         self.send_reminder_callback = send_reminder_callback
         self.is_running = False
         self.config = ConfigManager()
+        self._gemini = None  # Создаётся лениво и переиспользуется между проверками
 
         # Загружаем время утренних напоминаний из конфига
         morning_time_str = self.config.get_morning_reminder_time()
@@ -66,15 +67,13 @@ class ReminderScheduler:
 
         for task_id, user_id, title, conditions_json, last_check, interval in tasks_for_check:
             try:
-                from src.ai.gemini_processor import GeminiProcessor
                 import json
 
                 conditions = json.loads(conditions_json) if conditions_json else []
                 if not conditions:
                     continue
 
-                gemini = GeminiProcessor()
-                question = gemini.process_condition_check(title, conditions)
+                question = self._get_gemini().process_condition_check(title, conditions)
 
                 message = f"🔔 Проверка условий для задачи:\n\n📝 *{title}*\n\n❓ {question}"
 
@@ -86,6 +85,13 @@ class ReminderScheduler:
             except Exception as e:
                 logging.error(f"Ошибка проверки условий задачи {task_id}: {e}")
 
+    def _get_gemini(self):
+        """Получить GeminiProcessor (один клиент и соединение на весь планировщик)"""
+        if self._gemini is None:
+            from src.ai.gemini_processor import GeminiProcessor
+            self._gemini = GeminiProcessor()
+        return self._gemini
+
     def _format_reminder_message(self, task_title: str, reminder_type: str) -> str:
         """Форматирование сообщения напоминания"""
         if reminder_type == 'morning':
@@ -124,6 +130,17 @@ class ReminderScheduler:
         except Exception as e:
             logging.error(f"Ошибка планирования напоминания: {e}")
 
+    def schedule_task_reminders_bulk(self, task_id: int, user_id: int, reminders: List[Tuple[datetime, str]]):
+        """Запланировать несколько напоминаний задачи одной транзакцией"""
+        try:
+            self.db.add_reminders_bulk([
+                (task_id, user_id, reminder_time, reminder_type)
+                for reminder_time, reminder_type in reminders
+            ])
+            logging.info(f"Запланировано {len(reminders)} напоминаний для задачи {task_id}")
+        except Exception as e:
+            logging.error(f"Ошибка планирования напоминаний: {e}")
+
     def schedule_deadline_reminder(self, task_id: int, user_id: int, due_date: datetime):
         """Запланировать напоминание о дедлайне"""
         try:
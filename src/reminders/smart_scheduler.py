@@ -1,7 +1,9 @@
 import asyncio
+import heapq
 import logging
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Callable, Awaitable, Optional
+from typing import List, Tuple, Callable, Awaitable, Optional
 from dataclasses import dataclass
 
 from src.database.models import DatabaseManager
@@ -40,8 +42,11 @@ class SmartReminderScheduler:
         self.send_reminder_callback = send_reminder_callback
         self.config = ConfigManager()
 
-        # Очередь напоминаний (отсортирована по времени)
+        # Очередь напоминаний: min-heap по времени, [0] - ближайшее.
+        # Полностью упорядоченный список - ordered_reminders()
         self.reminder_queue: List[Reminder] = []
+        # task_id -> количество напоминаний задачи в очереди (для contains_task за O(1))
+        self._queued_task_ids: Counter = Counter()
 
         # Состояние
         self.is_running = False
@@ -89,7 +94,7 @@ class SmartReminderScheduler:
         try:
             future_reminders = self.db.get_future_reminders(hours=72)
 
-            self.reminder_queue = [
+            self._set_queue([
                 Reminder(
                     id=r[0],
                     task_id=r[1],
@@ -99,9 +104,7 @@ class SmartReminderScheduler:
                     time=datetime.fromisoformat(r[5]) if isinstance(r[5], str) else r[5]
                 )
                 for r in future_reminders
-            ]
-
-            self.reminder_queue.sort()
+            ])
             self.last_daily_reload = datetime.now()
 
             logging.info(f"📥 Загружено {len(self.reminder_queue)} напоминаний на 72 часа")
@@ -149,9 +152,10 @@ class SmartReminderScheduler:
                 for r in new_reminders
             ]
 
-            # Добавляем в очередь и пересортировываем
-            self.reminder_queue.extend(new_reminder_objects)
-            self.reminder_queue.sort()
+            # Добавляем в очередь
+            for reminder in new_reminder_objects:
+                heapq.heappush(self.reminder_queue, reminder)
+            self._queued_task_ids.update(r.task_id for r in new_reminder_objects)
 
             logging.info(f"📥 Догружено {len(new_reminder_objects)} напоминаний (окно 48-72ч)")
 
@@ -198,9 +202,9 @@ class SmartReminderScheduler:
         Добавление нового напоминания в очередь.
         Вызывается когда создаётся новая задача с напоминанием < 72 часов.
         """
-        # Добавляем в очередь и пересортировываем
-        self.reminder_queue.append(reminder)
-        self.reminder_queue.sort()
+        # Добавляем в очередь
+        heapq.heappush(self.reminder_queue, reminder)
+        self._queued_task_ids[reminder.task_id] += 1
 
         logging.info(f"➕ Напоминание добавлено в очередь: {reminder.time.strftime('%Y-%m-%d %H:%M')} ({reminder.title})")
 
@@ -209,6 +213,27 @@ class SmartReminderScheduler:
             self.wake_event.set()
             logging.info("⏰ Прерывание сна - новое ближайшее напоминание")
 
+    def _set_queue(self, reminders: List[Reminder]):
+        """Заменить очередь целиком (одна сортировка вместо N вставок) и пересобрать индекс задач"""
+        # Отсортированный список - корректная куча
+        self.reminder_queue = sorted(reminders)
+        self._queued_task_ids = Counter(r.task_id for r in self.reminder_queue)
+
+    def ordered_reminders(self) -> List[Reminder]:
+        """Напоминания очереди в порядке времени отправки"""
+        return sorted(self.reminder_queue)
+
+    def contains_task(self, task_id: int) -> bool:
+        """Есть ли в очереди напоминание для задачи"""
+        return self._queued_task_ids[task_id] > 0
+
+    def _unindex(self, reminder: Reminder):
+        """Убрать напоминание из индекса задач очереди"""
+        if self._queued_task_ids[reminder.task_id] > 1:
+            self._queued_task_ids[reminder.task_id] -= 1
+        else:
+            self._queued_task_ids.pop(reminder.task_id, None)
+
     def get_next_wake_time(self) -> datetime:
         """Вычисляет время следующего пробуждения"""
         now = datetime.now()
@@ -273,7 +298,8 @@ class SmartReminderScheduler:
         processed = 0
 
         while self.reminder_queue and self.reminder_queue[0].time <= now:
-            reminder = self.reminder_queue.pop(0)
+            reminder = heapq.heappop(self.reminder_queue)
+            self._unindex(reminder)
 
             try:
                 # Форматируем сообщение
@@ -339,6 +365,46 @@ class SmartReminderScheduler:
         except Exception as e:
             logging.error(f"Ошибка планирования напоминания: {e}")
 
+    def schedule_task_reminders_bulk(self, task_id: int, user_id: int, reminders: List[Tuple[datetime, str]]):
+        """
+        Создать несколько напоминаний задачи за один проход.
+        Все записи сохраняются в БД одной транзакцией, title задачи запрашивается один раз.
+
+        Args:
+            reminders: Список кортежей (reminder_time, reminder_type)
+        """
+        try:
+            reminder_ids = self.db.add_reminders_bulk([
+                (task_id, user_id, reminder_time, reminder_type)
+                for reminder_time, reminder_type in reminders
+            ])
+
+            # В очередь попадают только напоминания в пределах 72 часов
+            horizon = datetime.now() + timedelta(hours=72)
+            near = [
+                (reminder_id, reminder_time, reminder_type)
+                for reminder_id, (reminder_time, reminder_type) in zip(reminder_ids, reminders)
+                if reminder_time <= horizon
+            ]
+
+            if near:
+                task = self.db.get_task_by_id(task_id)
+                if task:
+                    for reminder_id, reminder_time, reminder_type in near:
+                        self.add_reminder_to_queue(Reminder(
+                            id=reminder_id,
+                            task_id=task_id,
+                            user_id=user_id,
+                            time=reminder_time,
+                            type=reminder_type,
+                            title=task[2]
+                        ))
+
+            logging.info(f"Запланировано {len(reminders)} напоминаний для задачи {task_id}")
+
+        except Exception as e:
+            logging.error(f"Ошибка планирования напоминаний: {e}")
+
     def schedule_deadline_reminder(self, task_id: int, user_id: int, due_date: datetime):
         """Запланировать напоминание о дедлайне (для совместимости)"""
         try:
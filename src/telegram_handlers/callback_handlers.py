@@ -6,16 +6,27 @@ from datetime import datetime, timedelta
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.database.models import DatabaseManager
-from src.telegram_ui.keyboards import KeyboardBuilder
+from src.telegram_ui.keyboards import (
+    KeyboardBuilder, CB_TASK_DONE, CB_TASK_VIEW, CB_TASK_EDIT, CB_TASK_SNOOZE, CB_TASK_DELETE,
+    CB_CATEGORY_VIEW, CB_CONFIRM, CB_CANCEL, CB_SETTINGS_REMINDERS, CB_SETTINGS_CATEGORIES,
+    CB_SETTINGS_TIME, CB_SETTINGS_BACK
+)
+from src.telegram_handlers.rate_limiter import TokenBucket
 
 
 class CallbackHandler:
     """Класс для обработки callback query"""
 
-    def __init__(self, db: DatabaseManager, reminder_scheduler=None):
+    def __init__(self, db: DatabaseManager, reminder_scheduler=None, send_bucket: TokenBucket = None):
         self.db = db
         self.reminder_scheduler = reminder_scheduler
         self.keyboards = KeyboardBuilder()
+        # Лимит исходящих запросов к Telegram - общий с TaskBotHandlers
+        self._send_bucket = send_bucket or TokenBucket(rate=30, capacity=30)
+
+    async def _edit(self, query, text: str, **kwargs):
+        """Изменение сообщения с учётом лимита Telegram на частоту отправки"""
+        return await self._send_bucket.call(query.edit_message_text, text, **kwargs)
 
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
@@ -24,7 +35,7 @@ class CallbackHandler:
         Формат callback_data: "action:param1:param2:..."
         """
         query = update.callback_query
-        await query.answer()  # Убрать "часики" загрузки
+        await self._send_bucket.call(query.answer)  # Убрать "часики" загрузки
 
         callback_data = query.data
         user_id = query.from_user.id
@@ -35,48 +46,48 @@ class CallbackHandler:
             action = parts[0]
 
             # Маршрутизация по action
-            if action == "task_done":
+            if action == CB_TASK_DONE:
                 await self._handle_task_done(query, user_id, int(parts[1]))
 
-            elif action == "task_delete":
+            elif action == CB_TASK_DELETE:
                 await self._handle_task_delete(query, user_id, int(parts[1]))
 
-            elif action == "task_view":
+            elif action == CB_TASK_VIEW:
                 await self._handle_task_view(query, user_id, int(parts[1]))
 
-            elif action == "task_edit":
+            elif action == CB_TASK_EDIT:
                 await self._handle_task_edit(query, user_id, int(parts[1]))
 
-            elif action == "task_snooze":
+            elif action == CB_TASK_SNOOZE:
                 await self._handle_task_snooze(query, user_id, int(parts[1]), int(parts[2]))
 
-            elif action == "category_view":
+            elif action == CB_CATEGORY_VIEW:
                 await self._handle_category_view(query, user_id, parts[1])
 
-            elif action == "confirm":
+            elif action == CB_CONFIRM:
                 await self._handle_confirm(query, user_id, parts[1], int(parts[2]))
 
-            elif action == "cancel":
-                await query.edit_message_text("❌ Действие отменено")
+            elif action == CB_CANCEL:
+                await self._edit(query, "❌ Действие отменено")
 
-            elif action == "settings_reminders":
+            elif action == CB_SETTINGS_REMINDERS:
                 await self._handle_settings_reminders(query, user_id)
 
-            elif action == "settings_categories":
+            elif action == CB_SETTINGS_CATEGORIES:
                 await self._handle_settings_categories(query, user_id)
 
-            elif action == "settings_time":
+            elif action == CB_SETTINGS_TIME:
                 await self._handle_settings_time(query, user_id)
 
-            elif action == "settings_back":
+            elif action == CB_SETTINGS_BACK:
                 await self._handle_settings_main(query, user_id)
 
             else:
-                await query.edit_message_text(f"⚠️ Неизвестная команда: {action}")
+                await self._edit(query, f"⚠️ Неизвестная команда: {action}")
 
         except Exception as e:
             logging.error(f"Ошибка обработки callback: {e}")
-            await query.edit_message_text("❌ Произошла ошибка при обработке команды")
+            await self._edit(query, "❌ Произошла ошибка при обработке команды")
 
     async def _handle_task_done(self, query, user_id: int, task_id: int):
         """Отметить задачу выполненной"""
@@ -87,16 +98,17 @@ class CallbackHandler:
             task = self.db.get_task_by_id(task_id)
             if task:
                 title = task[2]
-                await query.edit_message_text(f"✅ Задача выполнена!\n\n<b>{title}</b>", parse_mode='HTML')
+                await self._edit(query, f"✅ Задача выполнена!\n\n<b>{title}</b>", parse_mode='HTML')
             else:
-                await query.edit_message_text("✅ Задача выполнена!")
+                await self._edit(query, "✅ Задача выполнена!")
         else:
-            await query.edit_message_text("❌ Не удалось отметить задачу")
+            await self._edit(query, "❌ Не удалось отметить задачу")
 
     async def _handle_task_delete(self, query, user_id: int, task_id: int):
         """Запросить подтверждение удаления"""
         keyboard = self.keyboards.get_confirmation_keyboard("delete_task", task_id)
-        await query.edit_message_text(
+        await self._edit(
+            query,
             "⚠️ Вы уверены, что хотите удалить эту задачу?",
             reply_markup=keyboard
         )
@@ -106,7 +118,7 @@ class CallbackHandler:
         task = self.db.get_task_by_id(task_id)
 
         if not task:
-            await query.edit_message_text("❌ Задача не найдена")
+            await self._edit(query, "❌ Задача не найдена")
             return
 
         task_id, user_id, title, description, priority, due_date, category, tags, status = task
@@ -131,11 +143,12 @@ class CallbackHandler:
         text += f"📊 Статус: {status}"
 
         keyboard = self.keyboards.get_task_actions_keyboard(task_id)
-        await query.edit_message_text(text, parse_mode='HTML', reply_markup=keyboard)
+        await self._edit(query, text, parse_mode='HTML', reply_markup=keyboard)
 
     async def _handle_task_edit(self, query, user_id: int, task_id: int):
         """Редактирование задачи (заглушка)"""
-        await query.edit_message_text(
+        await self._edit(
+            query,
             "✏️ Редактирование задачи\n\n"
             "Эта функция будет реализована в следующих версиях.\n"
             "Пока вы можете удалить задачу и создать новую."
@@ -144,7 +157,7 @@ class CallbackHandler:
     async def _handle_task_snooze(self, query, user_id: int, task_id: int, minutes: int):
         """Отложить напоминание"""
         if not self.reminder_scheduler:
-            await query.edit_message_text("❌ Планировщик напоминаний недоступен")
+            await self._edit(query, "❌ Планировщик напоминаний недоступен")
             return
 
         # Вычисляем новое время
@@ -166,7 +179,8 @@ class CallbackHandler:
         if mins > 0:
             time_str += f"{mins} мин"
 
-        await query.edit_message_text(
+        await self._edit(
+            query,
             f"🔔 Напоминание отложено на {time_str}\n"
             f"⏰ Новое время: {new_time.strftime('%d.%m.%Y %H:%M')}"
         )
@@ -185,7 +199,7 @@ class CallbackHandler:
 
         if not tasks:
             text += "Нет задач"
-            await query.edit_message_text(text, parse_mode='HTML')
+            await self._edit(query, text, parse_mode='HTML')
             return
 
         # Форматируем задачи
@@ -200,7 +214,7 @@ class CallbackHandler:
             text += f"\n... и ещё {len(tasks) - 10} задач"
 
         keyboard = self.keyboards.get_task_list_keyboard(tasks[:10])
-        await query.edit_message_text(text, parse_mode='HTML', reply_markup=keyboard)
+        await self._edit(query, text, parse_mode='HTML', reply_markup=keyboard)
 
     async def _handle_confirm(self, query, user_id: int, action: str, item_id: int):
         """Обработка подтверждения действия"""
@@ -209,16 +223,17 @@ class CallbackHandler:
             task = self.db.get_task_by_id(item_id)
             if task:
                 self.db.mark_task_done(item_id)  # Временно используем mark_done
-                await query.edit_message_text(f"🗑 Задача удалена")
+                await self._edit(query, f"🗑 Задача удалена")
             else:
-                await query.edit_message_text("❌ Задача не найдена")
+                await self._edit(query, "❌ Задача не найдена")
         else:
-            await query.edit_message_text("✅ Действие подтверждено")
+            await self._edit(query, "✅ Действие подтверждено")
 
     async def _handle_settings_main(self, query, user_id: int):
         """Главное меню настроек"""
         keyboard = self.keyboards.get_settings_keyboard()
-        await query.edit_message_text(
+        await self._edit(
+            query,
             "⚙️ <b>Настройки</b>\n\n"
             "Выберите раздел:",
             parse_mode='HTML',
@@ -228,7 +243,8 @@ class CallbackHandler:
     async def _handle_settings_reminders(self, query, user_id: int):
         """Настройки напоминаний"""
         keyboard = self.keyboards.get_reminder_settings_keyboard()
-        await query.edit_message_text(
+        await self._edit(
+            query,
             "🔔 <b>Настройки напоминаний</b>\n\n"
             "Управление системой напоминаний:",
             parse_mode='HTML',
@@ -247,17 +263,18 @@ class CallbackHandler:
         else:
             text += "У вас пока нет категорий"
 
-        keyboard = self.keyboards.get_back_button("settings_back")
-        await query.edit_message_text(text, parse_mode='HTML', reply_markup=keyboard)
+        keyboard = self.keyboards.get_back_button(CB_SETTINGS_BACK)
+        await self._edit(query, text, parse_mode='HTML', reply_markup=keyboard)
 
     async def _handle_settings_time(self, query, user_id: int):
         """Настройки времени"""
-        await query.edit_message_text(
+        await self._edit(
+            query,
             "⏰ <b>Настройки времени уведомлений</b>\n\n"
             "Время настраивается в файле config.yaml\n"
             "Текущие настройки:\n"
             "• Утренние напоминания: 09:00\n"
             "• Напоминания о дедлайнах: за 1 и 3 дня",
             parse_mode='HTML',
-            reply_markup=self.keyboards.get_back_button("settings_back")
+            reply_markup=self.keyboards.get_back_button(CB_SETTINGS_BACK)
         )
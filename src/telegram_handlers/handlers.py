@@ -1,28 +1,105 @@
+import io
 import os
 import json
-import tempfile
-from datetime import datetime, date, timedelta
+import asyncio
+from datetime import datetime, date, timedelta, time as dt_time
+from typing import List, Tuple
+from functools import lru_cache
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from src.database.models import DatabaseManager
 from src.ai.gemini_processor import GeminiProcessor
-from src.voice.whisper_processor import VoiceProcessor
 from src.categories.manager import CategoryManager
 from src.reminders.scheduler import ReminderScheduler
 from src.config.manager import ConfigManager
 from src.telegram_ui.keyboards import KeyboardBuilder
+from src.telegram_handlers.rate_limiter import TokenBucket
+
+# Допустимые подкоманды /reset_db
+_RESET_SUBCOMMANDS = frozenset({'confirm'})
+
+# Допустимые значения приоритета (ответ Gemini не всегда им соответствует)
+_PRIORITY_LEVELS = frozenset({'high', 'medium', 'low'})
+
+# Эмодзи приоритетов
+_PRIORITY_EMOJI = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}
+_DEFAULT_PRIORITY_EMOJI = '🟡'
+
+# Текст /start; статус голосовых сообщений подставляется один раз при создании обработчиков
+_HELP_TEMPLATE = (
+    "👋 Привет! Я помогу организовать твои задачи.\n\n"
+    "📝 Просто отправь мне задачу текстом или голосовым сообщением.\n\n"
+    "🎤 Голосовые сообщения: {voice_status}\n\n"
+    "Команды:\n"
+    "/today - задачи на сегодня\n"
+    "/week - задачи на неделю\n"
+    "/all - все активные задачи\n"
+    "/categories - мои категории\n"
+    "/category [название] - задачи по категории\n"
+    "/done [id] - отметить выполненной\n"
+    "/settings - настройки\n"
+    "/myid - мой ID"
+)
+
+# Строка справки, которую видит только админ
+_ADMIN_HELP_SUFFIX = "\n/reset_db - удаление базы данных (только админ)"
+
+
+@lru_cache(maxsize=4096)
+def _parse_ymd(value: str) -> date:
+    """Разбор даты задачи 'YYYY-MM-DD' (fromisoformat реализован на C и быстрее strptime)"""
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=4096)
+def _fmt_dmy(value: str) -> str:
+    """'YYYY-MM-DD' -> 'DD.MM.YYYY'"""
+    return _parse_ymd(value).strftime('%d.%m.%Y')
+
+
+@lru_cache(maxsize=4096)
+def _fmt_dm(value: str) -> str:
+    """'YYYY-MM-DD' -> 'DD.MM'"""
+    return _parse_ymd(value).strftime('%d.%m')
 
 
 class TaskBotHandlers:
-    def __init__(self, db: DatabaseManager, reminder_scheduler: ReminderScheduler = None):
+    def __init__(self, db: DatabaseManager, reminder_scheduler: ReminderScheduler = None,
+                 send_bucket: TokenBucket = None):
         self.db = db
         self.gemini = GeminiProcessor()
-        self.voice_processor = VoiceProcessor()  # Заглушка для совместимости
         self.category_manager = CategoryManager(db)
         self.reminder_scheduler = reminder_scheduler
         self.config = ConfigManager()
         self.keyboards = KeyboardBuilder()
+        # Общий на всех пользователей лимит исходящих запросов (~30/с на бота);
+        # тот же bucket передаётся обработчику callback и отправке напоминаний
+        self._send_bucket = send_bucket or TokenBucket(rate=30, capacity=30)
+
+        # Reply кнопки главного меню -> обработчики
+        self._reply_dispatch = {
+            '📋 Сегодня': self.show_today,
+            '📅 Неделя': self.show_week,
+            '✅ Все задачи': self.show_all,
+            '📂 Категории': self.show_categories,
+            '⚙️ Настройки': self.show_settings,
+            '❓ Помощь': self.start,
+        }
+
+        # ID админа читаем из окружения один раз при старте
+        admin_id = os.getenv('ADMIN_TELEGRAM_ID')
+        self._admin_id = int(admin_id) if admin_id and admin_id.isdigit() else None
+        if admin_id and self._admin_id is None:
+            print(f"Warning: ADMIN_TELEGRAM_ID должен быть числом, получено: {admin_id!r}")
+
+        # Статус голосовой обработки не меняется после запуска - собираем текст /start один раз
+        self._start_text = _HELP_TEMPLATE.format(voice_status=self.gemini.get_voice_status_message())
+        self._start_text_admin = self._start_text + _ADMIN_HELP_SUFFIX
+
+    async def _reply(self, update: Update, text: str, **kwargs):
+        """Ответ на сообщение с учётом лимита Telegram на частоту отправки"""
+        return await self._send_bucket.call(update.message.reply_text, text, **kwargs)
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработка текстовых сообщений"""
@@ -35,10 +112,13 @@ class TaskBotHandlers:
                                    text: str, user_id: int, is_voice: bool = False):
         """Общая функция обработки задачи из текста"""
 
-        await update.message.chat.send_action(action="typing")
+        await self._send_bucket.call(update.message.chat.send_action, action="typing")
 
-        # Обработка через Gemini
-        structured = self.gemini.process_task_text(text)
+        # Обработка через Gemini - синхронный сетевой вызов, выполняем в потоке,
+        # чтобы не блокировать event loop для остальных пользователей.
+        # Запросы к БД остаются в loop: общее sqlite-соединение не рассчитано
+        # на одновременную работу из нескольких потоков
+        structured = await asyncio.to_thread(self.gemini.process_task_text, text)
 
         # Обработка категории
         if structured.get('category'):
@@ -53,13 +133,16 @@ class TaskBotHandlers:
         await self._schedule_reminders(task_id, user_id, structured)
 
         # Формирование ответа
-        await self._send_task_confirmation(update, task_id, structured, is_voice)
+        await self._send_task_confirmation(
+            update, task_id, structured, is_voice, transcribed_text=text if is_voice else None
+        )
 
     async def handle_voice_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработка голосовых сообщений через Gemini Audio API"""
         if not self.gemini.is_voice_processing_available():
             status = self.gemini.get_voice_status_message()
-            await update.message.reply_text(
+            await self._reply(
+                update,
                 f"🎤 Обработка голосовых сообщений недоступна.\n"
                 f"Статус: {status}"
             )
@@ -67,67 +150,61 @@ class TaskBotHandlers:
 
         user_id = update.effective_user.id
 
-        processing_msg = await update.message.reply_text("🎤 Обрабатываю голосовое сообщение...")
+        processing_msg = await self._reply(update, "🎤 Обрабатываю голосовое сообщение...")
 
         try:
-            # Скачиваем голосовое сообщение
+            # Скачиваем голосовое сообщение в память - оно небольшое, временный файл не нужен
             voice_file = await context.bot.get_file(update.message.voice.file_id)
+            buf = io.BytesIO()
+            await voice_file.download_to_memory(buf)
 
-            # Создаем временный файл
-            with tempfile.NamedTemporaryFile(suffix=".ogg", delete=False) as tmp_ogg:
-                await voice_file.download_to_drive(tmp_ogg.name)
-                ogg_path = tmp_ogg.name
-
-            try:
-                # Транскрибируем через Gemini
-                transcribed_text = await self.gemini.process_voice_message(ogg_path)
-
-                if not transcribed_text:
-                    await processing_msg.edit_text("😔 Не удалось распознать речь. Попробуйте отправить текстом.")
-                    return
-
-                # Удаляем сообщение о обработке
-                await processing_msg.delete()
+            # Транскрибируем через Gemini
+            transcribed_text = await self.gemini.process_voice_bytes(buf.getvalue(), mime_type="audio/ogg")
 
-                # Показываем распознанный текст
-                await update.message.reply_text(f"📝 Распознано: _{transcribed_text}_", parse_mode='Markdown')
+            if not transcribed_text:
+                await self._send_bucket.call(
+                    processing_msg.edit_text, "😔 Не удалось распознать речь. Попробуйте отправить текстом."
+                )
+                return
 
-                # Обрабатываем как обычную задачу
-                await self.process_task_from_text(update, context, transcribed_text, user_id, is_voice=True)
+            # Удаляем сообщение о обработке; распознанный текст покажем в подтверждении задачи
+            try:
+                await self._send_bucket.call(processing_msg.delete)
+            except Exception as e:
+                print(f"Warning: could not delete processing message: {e}")
 
-            finally:
-                # Удаляем временный файл
-                if os.path.exists(ogg_path):
-                    os.unlink(ogg_path)
+            # Обрабатываем как обычную задачу
+            await self.process_task_from_text(update, context, transcribed_text, user_id, is_voice=True)
 
         except Exception as e:
             print(f"Error processing voice: {e}")
             try:
-                await processing_msg.edit_text(
-                    "❌ Ошибка обработки голоса. Попробуйте отправить текстом."
+                await self._send_bucket.call(
+                    processing_msg.edit_text, "❌ Ошибка обработки голоса. Попробуйте отправить текстом."
                 )
             except:
-                await update.message.reply_text(
+                await self._reply(
+                    update,
                     "❌ Ошибка обработки голоса. Попробуйте отправить текстом."
                 )
 
     async def show_today(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать задачи на сегодня"""
         user_id = update.effective_user.id
-        today = date.today().strftime('%Y-%m-%d')
+        today = date.today()
 
-        tasks = self.db.get_tasks_by_date(user_id, today)
+        tasks = self.db.get_tasks_by_date(user_id, today.isoformat())
 
         if not tasks:
-            await update.message.reply_text("📭 На сегодня задач нет")
+            await self._reply(update, "📭 На сегодня задач нет")
             return
 
-        message = f"📋 *Задачи на сегодня ({datetime.now().strftime('%d.%m.%Y')}):*\n"
-        message += self.category_manager.format_tasks_by_category(tasks)
+        message = f"📋 *Задачи на сегодня ({today.strftime('%d.%m.%Y')}):*\n"
+        message += self.category_manager.format_tasks_by_category(tasks, user_id)
 
         # Добавляем inline кнопки для задач
         keyboard = self.keyboards.get_task_list_keyboard(tasks[:10])
-        await update.message.reply_text(message, parse_mode='Markdown', reply_markup=keyboard)
+        await self._reply(update, message, parse_mode='Markdown', reply_markup=keyboard)
 
     async def show_all(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать все активные задачи"""
@@ -135,15 +212,15 @@ class TaskBotHandlers:
         tasks = self.db.get_all_active_tasks(user_id)
 
         if not tasks:
-            await update.message.reply_text("📭 Нет активных задач")
+            await self._reply(update, "📭 Нет активных задач")
             return
 
         message = "📋 *Все активные задачи:*\n"
-        message += self.category_manager.format_tasks_by_category(tasks)
+        message += self.category_manager.format_tasks_by_category(tasks, user_id)
 
         # Добавляем inline кнопки
         keyboard = self.keyboards.get_task_list_keyboard(tasks[:10])
-        await update.message.reply_text(message, parse_mode='Markdown', reply_markup=keyboard)
+        await self._reply(update, message, parse_mode='Markdown', reply_markup=keyboard)
 
     async def show_week(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать задачи на неделю"""
@@ -154,18 +231,19 @@ class TaskBotHandlers:
         # Нужно добавить метод в DatabaseManager для получения задач по диапазону дат
         # tasks = self.db.get_tasks_by_date_range(user_id, today.strftime('%Y-%m-%d'), week_end.strftime('%Y-%m-%d'))
 
-        await update.message.reply_text("📅 Функция просмотра задач на неделю в разработке")
+        await self._reply(update, "📅 Функция просмотра задач на неделю в разработке")
 
     async def show_categories(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать категории пользователя"""
         user_id = update.effective_user.id
         categories_text = self.category_manager.get_categories_list(user_id)
-        await update.message.reply_text(categories_text, parse_mode='Markdown')
+        await self._reply(update, categories_text, parse_mode='Markdown')
 
     async def show_category_tasks(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать задачи по категории"""
         if not context.args:
-            await update.message.reply_text(
+            await self._reply(
+                update,
                 "Укажите категорию: /category работа\n"
                 "Доступные категории: /categories"
             )
@@ -174,30 +252,30 @@ class TaskBotHandlers:
         user_id = update.effective_user.id
         category_name = " ".join(context.args).lower()
 
-        tasks = self.db.get_tasks_by_category(user_id, category_name)
+        # Задачи и иконка категории одним запросом
+        tasks = self.db.get_tasks_by_category_with_display(user_id, category_name)
 
         if not tasks:
-            await update.message.reply_text(f"📭 В категории '{category_name}' нет задач")
+            await self._reply(update, f"📭 В категории '{category_name}' нет задач")
             return
 
-        category_display = self.category_manager.get_category_display_name(user_id, category_name)
-        message = f"📋 *Задачи в категории {category_display}:*\n\n"
-
-        for task_id, title, priority, conditions, due_date, category, tags in tasks:
-            priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '🟡')
-            date_text = ""
-            if due_date:
-                date_obj = datetime.strptime(due_date, '%Y-%m-%d')
-                date_text = f" ({date_obj.strftime('%d.%m')})"
+        color = tasks[0][4] or self.category_manager.default_categories.get(category_name, '📁')
+        category_display = f"{color} {category_name.title()}"
+        header = f"📋 *Задачи в категории {category_display}:*\n\n"
 
-            message += f"{priority_emoji} #{task_id} {title}{date_text}\n"
+        lines = [
+            f"{_PRIORITY_EMOJI.get(priority, _DEFAULT_PRIORITY_EMOJI)} #{task_id} {title}"
+            + (f" ({_fmt_dm(due_date)})" if due_date else "")
+            for task_id, title, priority, due_date, _color in tasks
+        ]
+        message = header + "\n".join(lines)
 
-        await update.message.reply_text(message, parse_mode='Markdown')
+        await self._reply(update, message, parse_mode='Markdown')
 
     async def mark_done(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Отметить задачу выполненной"""
         if not context.args:
-            await update.message.reply_text("Укажите ID задачи: /done 123")
+            await self._reply(update, "Укажите ID задачи: /done 123")
             return
 
         try:
@@ -205,62 +283,47 @@ class TaskBotHandlers:
             user_id = update.effective_user.id
 
             if self.db.mark_task_done(task_id, user_id):
-                await update.message.reply_text(f"✅ Задача #{task_id} выполнена!")
+                await self._reply(update, f"✅ Задача #{task_id} выполнена!")
             else:
-                await update.message.reply_text(f"Задача #{task_id} не найдена")
+                await self._reply(update, f"Задача #{task_id} не найдена")
 
         except ValueError:
-            await update.message.reply_text("Неверный формат. Используйте: /done 123")
+            await self._reply(update, "Неверный формат. Используйте: /done 123")
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Команда /start"""
-        voice_status = self.gemini.get_voice_status_message()
         user_id = update.effective_user.id
-        admin_id = os.getenv('ADMIN_TELEGRAM_ID')
 
         keyboard = self.keyboards.get_main_menu_keyboard()
 
-        help_text = (
-            "👋 Привет! Я помогу организовать твои задачи.\n\n"
-            "📝 Просто отправь мне задачу текстом или голосовым сообщением.\n\n"
-            "🎤 Голосовые сообщения: " + voice_status + "\n\n"
-            "Команды:\n"
-            "/today - задачи на сегодня\n"
-            "/week - задачи на неделю\n"
-            "/all - все активные задачи\n"
-            "/categories - мои категории\n"
-            "/category [название] - задачи по категории\n"
-            "/done [id] - отметить выполненной\n"
-            "/settings - настройки\n"
-            "/myid - мой ID"
-        )
-
-        # Добавляем команду reset_db только для админа
-        if admin_id and str(user_id) == admin_id:
-            help_text += "\n/reset_db - удаление базы данных (только админ)"
+        # Команду reset_db видит только админ
+        if self._admin_id is not None and user_id == self._admin_id:
+            help_text = self._start_text_admin
+        else:
+            help_text = self._start_text
 
-        await update.message.reply_text(help_text, reply_markup=keyboard)
+        await self._reply(update, help_text, reply_markup=keyboard)
 
     async def get_my_id(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать ID пользователя"""
         user_id = update.effective_user.id
-        await update.message.reply_text(f"Ваш Telegram ID: `{user_id}`", parse_mode='Markdown')
+        await self._reply(update, f"Ваш Telegram ID: `{user_id}`", parse_mode='Markdown')
 
     async def reset_database(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Сброс базы данных (только для админа)"""
         user_id = update.effective_user.id
-        admin_id = os.getenv('ADMIN_TELEGRAM_ID')
 
-        if not admin_id:
-            await update.message.reply_text("❌ Админ не настроен")
+        if self._admin_id is None:
+            await self._reply(update, "❌ Админ не настроен")
             return
 
-        if str(user_id) != admin_id:
-            await update.message.reply_text("❌ У вас нет прав для этой команды")
+        if user_id != self._admin_id:
+            await self._reply(update, "❌ У вас нет прав для этой команды")
             return
 
-        if not context.args or context.args[0] != 'confirm':
-            await update.message.reply_text(
+        if not context.args or context.args[0] not in _RESET_SUBCOMMANDS:
+            await self._reply(
+                update,
                 "⚠️ Это удалит ВСЕ задачи!\n"
                 "Для подтверждения используйте:\n"
                 "`/reset_db confirm`",
@@ -270,15 +333,20 @@ class TaskBotHandlers:
 
         try:
             self.db.reset_database()
-            await update.message.reply_text("✅ База данных успешно сброшена!")
+            await self._reply(update, "✅ База данных успешно сброшена!")
         except Exception as e:
-            await update.message.reply_text(f"❌ Ошибка: {e}")
+            await self._reply(update, f"❌ Ошибка: {e}")
 
     async def _schedule_reminders(self, task_id: int, user_id: int, structured: dict):
         """Планирование напоминаний для задачи на основе конфигурации"""
         if not self.reminder_scheduler:
             return
 
+        now = datetime.now()
+
+        # Все напоминания задачи собираем в список и планируем одним вызовом
+        pending: List[Tuple[datetime, str]] = []
+
         # Если указано конкретное время напоминания
         if structured.get('reminder_needed') and structured.get('reminder_time'):
             try:
@@ -286,14 +354,12 @@ class TaskBotHandlers:
                 hour, minute = map(int, reminder_time_str.split(':'))
 
                 # Планируем на сегодня или завтра
-                reminder_date = date.today()
-                from datetime import time as dt_time
-                if datetime.now().time() > dt_time(hour, minute):
+                reminder_date = now.date()
+                if now.time() > dt_time(hour, minute):
                     reminder_date = reminder_date + timedelta(days=1)
 
                 reminder_datetime = datetime.combine(reminder_date, dt_time(hour, minute))
-
-                self.reminder_scheduler.schedule_task_reminder(task_id, user_id, reminder_datetime)
+                pending.append((reminder_datetime, 'specific_time'))
 
             except Exception as e:
                 print(f"Ошибка планирования напоминания: {e}")
@@ -301,15 +367,14 @@ class TaskBotHandlers:
         # Напоминания о дедлайне (из конфигурации)
         if structured.get('due_date'):
             try:
-                due_date = datetime.strptime(structured['due_date'], '%Y-%m-%d')
-                from datetime import time as dt_time
+                due_date = _parse_ymd(structured['due_date'])
 
                 # Если есть точное время события - используем его
                 if structured.get('has_specific_time') and structured.get('due_time'):
                     try:
                         # Создаем полный datetime события
                         event_hour, event_minute = map(int, structured['due_time'].split(':'))
-                        event_datetime = datetime.combine(due_date.date(), dt_time(event_hour, event_minute))
+                        event_datetime = datetime.combine(due_date, dt_time(event_hour, event_minute))
 
                         # Проверяем, включены ли напоминания по времени
                         if self.config.is_time_based_reminders_enabled():
@@ -317,20 +382,16 @@ class TaskBotHandlers:
                             hours_before = self.config.get_time_based_hours_before()
                             for hours in hours_before:
                                 reminder_datetime = event_datetime - timedelta(hours=hours)
-                                if reminder_datetime > datetime.now():
-                                    self.reminder_scheduler.schedule_task_reminder(
-                                        task_id, user_id, reminder_datetime, 'time_based'
-                                    )
+                                if reminder_datetime > now:
+                                    pending.append((reminder_datetime, 'time_based'))
                                     print(f"Запланировано напоминание на {reminder_datetime} (за {hours} ч. до {structured['due_time']})")
 
                             # Напоминания за N минут (если настроены)
                             minutes_before = self.config.get_time_based_minutes_before()
                             for minutes in minutes_before:
                                 reminder_datetime = event_datetime - timedelta(minutes=minutes)
-                                if reminder_datetime > datetime.now():
-                                    self.reminder_scheduler.schedule_task_reminder(
-                                        task_id, user_id, reminder_datetime, 'time_based'
-                                    )
+                                if reminder_datetime > now:
+                                    pending.append((reminder_datetime, 'time_based'))
                                     print(f"Запланировано напоминание на {reminder_datetime} (за {minutes} мин. до {structured['due_time']})")
 
                     except Exception as e:
@@ -352,86 +413,78 @@ class TaskBotHandlers:
                         continue
 
                     # Вычисляем дату напоминания
-                    reminder_date = due_date.date() - timedelta(days=days_before)
+                    reminder_date = due_date - timedelta(days=days_before)
                     reminder_datetime = datetime.combine(reminder_date, reminder_time)
 
                     # Создаем напоминание только если оно в будущем
-                    if reminder_datetime > datetime.now():
-                        self.reminder_scheduler.schedule_task_reminder(
-                            task_id, user_id, reminder_datetime, 'deadline'
-                        )
+                    if reminder_datetime > now:
+                        pending.append((reminder_datetime, 'deadline'))
                         print(f"Запланировано напоминание на {reminder_datetime} (за {days_before} дней)")
 
             except Exception as e:
                 print(f"Ошибка планирования напоминания о дедлайне: {e}")
 
-    async def _send_task_confirmation(self, update: Update, task_id: int, structured: dict, is_voice: bool = False):
+        if pending:
+            self.reminder_scheduler.schedule_task_reminders_bulk(task_id, user_id, pending)
+
+    async def _send_task_confirmation(self, update: Update, task_id: int, structured: dict, is_voice: bool = False,
+                                      transcribed_text: str = None):
         """Отправка подтверждения создания задачи"""
-        # Условия
-        conditions_text = ""
-        if structured.get('conditions'):
-            conditions_text = "\n📌 Условия: " + ", ".join(structured['conditions'])
+        # Приоритет
+        priority = structured.get('priority', 'medium')
+        if priority not in _PRIORITY_LEVELS:
+            priority = 'medium'
+
+        priority_emoji = _PRIORITY_EMOJI.get(priority, _DEFAULT_PRIORITY_EMOJI)
+
+        parts = []
+
+        # Распознанный текст голосового - в том же сообщении, а не отдельным
+        if transcribed_text:
+            parts.append(f"📝 Распознано: _{transcribed_text}_\n\n")
+
+        # Заголовок одним фрагментом; необязательные поля добавляются только при наличии
+        parts.append(
+            f"✅ {'🎤 ' if is_voice else ''}Задача #{task_id} сохранена!\n\n"
+            f"📝 *{structured['title']}*\n"
+            f"{priority_emoji} Приоритет: {priority}"
+        )
 
         # Дата
-        date_text = ""
         if structured.get('due_date'):
-            date_obj = datetime.strptime(structured['due_date'], '%Y-%m-%d')
-            date_text = f"\n📅 Дата: {date_obj.strftime('%d.%m.%Y')}"
+            parts.append(f"\n📅 Дата: {_fmt_dmy(structured['due_date'])}")
 
         # Категория
-        category_text = ""
         if structured.get('category'):
             category_display = self.category_manager.get_category_display_name(
                 update.effective_user.id, structured['category']
             )
-            category_text = f"\n📂 Категория: {category_display}"
+            parts.append(f"\n📂 Категория: {category_display}")
 
         # Теги
-        tags_text = ""
         if structured.get('tags'):
-            tags_text = f"\n🏷️ Теги: {', '.join(structured['tags'])}"
+            parts.append(f"\n🏷️ Теги: {', '.join(structured['tags'])}")
 
-        # Приоритет
-        priority_emoji = {
-            'high': '🔴',
-            'medium': '🟡',
-            'low': '🟢'
-        }.get(structured.get('priority', 'medium'), '🟡')
-
-        # Иконка голосового сообщения
-        voice_emoji = "🎤 " if is_voice else ""
+        # Условия
+        if structured.get('conditions'):
+            parts.append("\n📌 Условия: " + ", ".join(structured['conditions']))
 
         # Добавляем кнопки действий
         keyboard = self.keyboards.get_task_actions_keyboard(task_id)
 
-        await update.message.reply_text(
-            f"✅ {voice_emoji}Задача #{task_id} сохранена!\n\n"
-            f"📝 *{structured['title']}*\n"
-            f"{priority_emoji} Приоритет: {structured.get('priority', 'medium')}"
-            f"{date_text}"
-            f"{category_text}"
-            f"{tags_text}"
-            f"{conditions_text}",
+        await self._reply(
+            update,
+            "".join(parts),
             parse_mode='Markdown',
             reply_markup=keyboard
         )
 
     async def handle_reply_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработка нажатий на Reply кнопки"""
-        text = update.message.text
-
-        if text == '📋 Сегодня':
-            await self.show_today(update, context)
-        elif text == '📅 Неделя':
-            await self.show_week(update, context)
-        elif text == '✅ Все задачи':
-            await self.show_all(update, context)
-        elif text == '📂 Категории':
-            await self.show_categories(update, context)
-        elif text == '⚙️ Настройки':
-            await self.show_settings(update, context)
-        elif text == '❓ Помощь':
-            await self.start(update, context)
+        handler = self._reply_dispatch.get(update.message.text)
+
+        if handler:
+            await handler(update, context)
         else:
             # Это обычное сообщение - создаем задачу
             await self.handle_message(update, context)
@@ -439,7 +492,8 @@ class TaskBotHandlers:
     async def show_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Показать настройки"""
         keyboard = self.keyboards.get_settings_keyboard()
-        await update.message.reply_text(
+        await self._reply(
+            update,
             "⚙️ *Настройки*\n\n"
             "Выберите раздел:",
             parse_mode='Markdown',
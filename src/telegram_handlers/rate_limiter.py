@@ -0,0 +1,66 @@
+"""
+Ограничение частоты исходящих сообщений бота
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar('T')
+
+
+class TokenBucket:
+    """
+    Token bucket для исходящих запросов к Telegram API
+
+    Telegram допускает около 30 сообщений в секунду на бота; при превышении
+    отвечает 429 и блокирует отправку. Корутина ждёт свободный токен вместо ошибки.
+    """
+
+    def __init__(self, rate: float = 30, capacity: int = 30,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        """
+        Args:
+            rate: Скорость пополнения (токенов в секунду)
+            capacity: Максимальное количество токенов (допустимый всплеск)
+            clock: Источник монотонного времени (в секундах)
+            sleep: Корутина ожидания; clock и sleep подменяются в тестах
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """Количество доступных токенов на момент последнего обращения"""
+        return self._tokens
+
+    async def acquire(self):
+        """Дождаться и забрать один токен"""
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await self._sleep((1 - self._tokens) / self.rate)
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Выполнить запрос к Telegram API после получения токена"""
+        async with self:
+            return await func(*args, **kwargs)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
@@ -1,10 +1,86 @@
 """
 Модуль клавиатур для Telegram бота
 """
+from functools import lru_cache
 from telegram import ReplyKeyboardMarkup, InlineKeyboardButton, InlineKeyboardMarkup
 from typing import List, Optional
 
 
+# Действия callback_data ("action:param1:param2:...") - общие для клавиатур и CallbackHandler
+CB_TASK_DONE = "task_done"
+CB_TASK_VIEW = "task_view"
+CB_TASK_EDIT = "task_edit"
+CB_TASK_SNOOZE = "task_snooze"
+CB_TASK_DELETE = "task_delete"
+CB_CATEGORY_VIEW = "category_view"
+CB_CONFIRM = "confirm"
+CB_CANCEL = "cancel"
+CB_SETTINGS_REMINDERS = "settings_reminders"
+CB_SETTINGS_CATEGORIES = "settings_categories"
+CB_SETTINGS_TIME = "settings_time"
+CB_SETTINGS_BACK = "settings_back"
+
+# Префиксы callback_data с параметрами
+_DONE = CB_TASK_DONE + ":"
+_VIEW = CB_TASK_VIEW + ":"
+_EDIT = CB_TASK_EDIT + ":"
+_SNOOZE = CB_TASK_SNOOZE + ":"
+_DELETE = CB_TASK_DELETE + ":"
+_CATEGORY_VIEW = CB_CATEGORY_VIEW + ":"
+_CONFIRM = CB_CONFIRM + ":"
+_CANCEL = CB_CANCEL + ":"
+
+# Статические клавиатуры не зависят от пользователя - собираем их один раз при импорте.
+# Объекты telegram неизменяемы после создания, поэтому их безопасно переиспользовать.
+_MAIN_MENU_KEYBOARD = ReplyKeyboardMarkup(
+    [
+        ['📋 Сегодня', '📅 Неделя'],
+        ['✅ Все задачи', '📂 Категории'],
+        ['⚙️ Настройки', '❓ Помощь']
+    ],
+    resize_keyboard=True,
+    one_time_keyboard=False
+)
+
+_PRIORITY_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🔴 Высокий", callback_data="priority:high"),
+        InlineKeyboardButton("🟡 Средний", callback_data="priority:medium"),
+        InlineKeyboardButton("🟢 Низкий", callback_data="priority:low")
+    ]
+])
+
+_SETTINGS_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🔔 Напоминания", callback_data=CB_SETTINGS_REMINDERS)
+    ],
+    [
+        InlineKeyboardButton("📂 Категории", callback_data=CB_SETTINGS_CATEGORIES)
+    ],
+    [
+        InlineKeyboardButton("⏰ Время уведомлений", callback_data=CB_SETTINGS_TIME)
+    ],
+    [
+        InlineKeyboardButton("« Назад", callback_data=CB_SETTINGS_BACK)
+    ]
+])
+
+_REMINDER_SETTINGS_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🌅 Утренние напоминания", callback_data="reminder_morning")
+    ],
+    [
+        InlineKeyboardButton("📅 Напоминания о дедлайнах", callback_data="reminder_deadline")
+    ],
+    [
+        InlineKeyboardButton("⏱ Временные напоминания", callback_data="reminder_timed")
+    ],
+    [
+        InlineKeyboardButton("« Назад", callback_data=CB_SETTINGS_BACK)
+    ]
+])
+
+
 class KeyboardBuilder:
     """Класс для создания клавиатур"""
 
@@ -13,18 +89,10 @@ class KeyboardBuilder:
         """
         Главная Reply клавиатура (постоянная панель)
         """
-        keyboard = [
-            ['📋 Сегодня', '📅 Неделя'],
-            ['✅ Все задачи', '📂 Категории'],
-            ['⚙️ Настройки', '❓ Помощь']
-        ]
-        return ReplyKeyboardMarkup(
-            keyboard,
-            resize_keyboard=True,
-            one_time_keyboard=False
-        )
+        return _MAIN_MENU_KEYBOARD
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def get_task_actions_keyboard(task_id: int) -> InlineKeyboardMarkup:
         """
         Inline клавиатура для действий с задачей
@@ -34,15 +102,15 @@ class KeyboardBuilder:
         """
         keyboard = [
             [
-                InlineKeyboardButton("✅ Выполнено", callback_data=f"task_done:{task_id}"),
-                InlineKeyboardButton("✏️ Изменить", callback_data=f"task_edit:{task_id}")
+                InlineKeyboardButton("✅ Выполнено", callback_data=f"{_DONE}{task_id}"),
+                InlineKeyboardButton("✏️ Изменить", callback_data=f"{_EDIT}{task_id}")
             ],
             [
-                InlineKeyboardButton("🔔 Отложить 15м", callback_data=f"task_snooze:{task_id}:15"),
-                InlineKeyboardButton("🔔 Отложить 1ч", callback_data=f"task_snooze:{task_id}:60")
+                InlineKeyboardButton("🔔 Отложить 15м", callback_data=f"{_SNOOZE}{task_id}:15"),
+                InlineKeyboardButton("🔔 Отложить 1ч", callback_data=f"{_SNOOZE}{task_id}:60")
             ],
             [
-                InlineKeyboardButton("🗑 Удалить", callback_data=f"task_delete:{task_id}")
+                InlineKeyboardButton("🗑 Удалить", callback_data=f"{_DELETE}{task_id}")
             ]
         ]
         return InlineKeyboardMarkup(keyboard)
@@ -57,13 +125,13 @@ class KeyboardBuilder:
         """
         keyboard = []
         for task in tasks:
-            task_id = task[0]
+            tid = str(task[0])
             title = task[2][:40]  # Ограничиваем длину
 
-            keyboard.append([
-                InlineKeyboardButton(f"✅ {title}", callback_data=f"task_done:{task_id}"),
-                InlineKeyboardButton("👁", callback_data=f"task_view:{task_id}")
-            ])
+            keyboard.append((
+                InlineKeyboardButton("✅ " + title, callback_data=_DONE + tid),
+                InlineKeyboardButton("👁", callback_data=_VIEW + tid)
+            ))
 
         return InlineKeyboardMarkup(keyboard)
 
@@ -82,7 +150,7 @@ class KeyboardBuilder:
             cat_id, name, color = cat
             row.append(InlineKeyboardButton(
                 f"{color} {name.title()}",
-                callback_data=f"category_view:{name}"
+                callback_data=_CATEGORY_VIEW + name
             ))
 
             # По 2 кнопки в ряду
@@ -96,7 +164,7 @@ class KeyboardBuilder:
 
         # Кнопка "Все задачи"
         keyboard.append([
-            InlineKeyboardButton("📋 Все задачи", callback_data="category_view:all")
+            InlineKeyboardButton("📋 Все задачи", callback_data=_CATEGORY_VIEW + "all")
         ])
 
         return InlineKeyboardMarkup(keyboard)
@@ -106,16 +174,10 @@ class KeyboardBuilder:
         """
         Клавиатура выбора приоритета
         """
-        keyboard = [
-            [
-                InlineKeyboardButton("🔴 Высокий", callback_data="priority:high"),
-                InlineKeyboardButton("🟡 Средний", callback_data="priority:medium"),
-                InlineKeyboardButton("🟢 Низкий", callback_data="priority:low")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _PRIORITY_KEYBOARD
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def get_snooze_keyboard(task_id: int) -> InlineKeyboardMarkup:
         """
         Клавиатура для отложения напоминания
@@ -125,20 +187,21 @@ class KeyboardBuilder:
         """
         keyboard = [
             [
-                InlineKeyboardButton("15 минут", callback_data=f"task_snooze:{task_id}:15"),
-                InlineKeyboardButton("30 минут", callback_data=f"task_snooze:{task_id}:30")
+                InlineKeyboardButton("15 минут", callback_data=f"{_SNOOZE}{task_id}:15"),
+                InlineKeyboardButton("30 минут", callback_data=f"{_SNOOZE}{task_id}:30")
             ],
             [
-                InlineKeyboardButton("1 час", callback_data=f"task_snooze:{task_id}:60"),
-                InlineKeyboardButton("3 часа", callback_data=f"task_snooze:{task_id}:180")
+                InlineKeyboardButton("1 час", callback_data=f"{_SNOOZE}{task_id}:60"),
+                InlineKeyboardButton("3 часа", callback_data=f"{_SNOOZE}{task_id}:180")
             ],
             [
-                InlineKeyboardButton("Завтра", callback_data=f"task_snooze:{task_id}:1440")
+                InlineKeyboardButton("Завтра", callback_data=f"{_SNOOZE}{task_id}:1440")
             ]
         ]
         return InlineKeyboardMarkup(keyboard)
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def get_confirmation_keyboard(action: str, item_id: int) -> InlineKeyboardMarkup:
         """
         Клавиатура подтверждения действия
@@ -149,8 +212,8 @@ class KeyboardBuilder:
         """
         keyboard = [
             [
-                InlineKeyboardButton("✅ Да", callback_data=f"confirm:{action}:{item_id}"),
-                InlineKeyboardButton("❌ Нет", callback_data=f"cancel:{action}")
+                InlineKeyboardButton("✅ Да", callback_data=f"{_CONFIRM}{action}:{item_id}"),
+                InlineKeyboardButton("❌ Нет", callback_data=_CANCEL + action)
             ]
         ]
         return InlineKeyboardMarkup(keyboard)
@@ -160,44 +223,17 @@ class KeyboardBuilder:
         """
         Клавиатура настроек
         """
-        keyboard = [
-            [
-                InlineKeyboardButton("🔔 Напоминания", callback_data="settings_reminders")
-            ],
-            [
-                InlineKeyboardButton("📂 Категории", callback_data="settings_categories")
-            ],
-            [
-                InlineKeyboardButton("⏰ Время уведомлений", callback_data="settings_time")
-            ],
-            [
-                InlineKeyboardButton("« Назад", callback_data="settings_back")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _SETTINGS_KEYBOARD
 
     @staticmethod
     def get_reminder_settings_keyboard() -> InlineKeyboardMarkup:
         """
         Клавиатура настроек напоминаний
         """
-        keyboard = [
-            [
-                InlineKeyboardButton("🌅 Утренние напоминания", callback_data="reminder_morning")
-            ],
-            [
-                InlineKeyboardButton("📅 Напоминания о дедлайнах", callback_data="reminder_deadline")
-            ],
-            [
-                InlineKeyboardButton("⏱ Временные напоминания", callback_data="reminder_timed")
-            ],
-            [
-                InlineKeyboardButton("« Назад", callback_data="settings_back")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _REMINDER_SETTINGS_KEYBOARD
 
     @staticmethod
+    @lru_cache(maxsize=64)
     def get_back_button(callback_data: str = "back") -> InlineKeyboardMarkup:
         """
         Простая кнопка "Назад"
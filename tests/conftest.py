@@ -2,33 +2,108 @@
 Pytest configuration and shared fixtures
 """
 import pytest
+import asyncio
+import json
 import sqlite3
-import tempfile
-import os
-from datetime import datetime, timedelta
-from unittest.mock import Mock, AsyncMock, MagicMock
-
 import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
 
 from src.database.models import DatabaseManager
-from src.reminders.smart_scheduler import SmartReminderScheduler, Reminder
-from src.config.manager import ConfigManager
+from src.reminders.smart_scheduler import SmartReminderScheduler
 
 
-@pytest.fixture
-def temp_db():
-    """Temporary in-memory database for testing"""
-    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-        db_path = f.name
+@pytest.fixture(scope="session", autouse=True)
+def _genai_patch():
+    """Replace the google.generativeai module for the whole session (no real API setup).
+
+    The stub goes into sys.modules, so src.ai.gemini_processor binds it on first
+    import and runs that never touch Gemini don't pay for importing the real SDK.
+    """
+    mock_genai = MagicMock()
+    with patch.dict(sys.modules, {'google.generativeai': mock_genai}):
+        if 'src.ai.gemini_processor' in sys.modules:
+            # Already imported with the real SDK - patch the bound name instead
+            with patch('src.ai.gemini_processor.genai', mock_genai):
+                yield mock_genai
+        else:
+            yield mock_genai
+
+
+# Test databases live in memory and are thrown away: trade durability for speed
+_FAST_PRAGMAS = """
+    PRAGMA synchronous=OFF;
+    PRAGMA journal_mode=MEMORY;
+    PRAGMA locking_mode=EXCLUSIVE;
+    PRAGMA temp_store=MEMORY;
+"""
 
-    db = DatabaseManager(db_path)
+
+@pytest.fixture(scope="session")
+def template_db():
+    """Schema-only database, built once per session"""
+    db = DatabaseManager(":memory:")
+    db.conn.executescript(_FAST_PRAGMAS)
+    yield db
+    db.conn.close()
+
+
+@pytest.fixture(scope="session")
+def session_db():
+    """Long-lived in-memory database handed out to every test by temp_db"""
+    conn = sqlite3.connect(
+        ":memory:", check_same_thread=False,
+        cached_statements=DatabaseManager.CACHED_STATEMENTS,
+    )
+    conn.executescript(_FAST_PRAGMAS)
+
+    db = DatabaseManager.__new__(DatabaseManager)
+    db.db_path = ":memory:"
+    db.conn = conn
     yield db
 
     # Cleanup
+    conn.close()
+
+
+def _db_state(conn):
+    """Row-change counter plus schema version, to detect a dirty database"""
+    return conn.total_changes, conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
+@pytest.fixture
+def temp_db(template_db, session_db):
+    """In-memory database for testing, reset to the empty schema before each test.
+
+    DatabaseManager commits inside its methods, so a SAVEPOINT/ROLLBACK wrapper
+    cannot isolate tests; instead the template pages are copied over the same
+    connection with the backup API. The copy is skipped when the previous test
+    left no row changes and no schema changes behind.
+    """
+    conn = session_db.conn
+    if conn.in_transaction:
+        conn.rollback()
+    if getattr(session_db, "_clean_state", None) != _db_state(conn):
+        template_db.conn.backup(conn)
+        session_db._clean_state = _db_state(conn)
+    yield session_db
+
+
+@pytest.fixture
+def cur(temp_db):
+    """One cursor on temp_db for the whole test, closed afterwards"""
+    c = temp_db.conn.cursor()
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """File-backed database for tests that need real on-disk behaviour"""
+    db = DatabaseManager(str(tmp_path / "test.db"))
+    yield db
     db.conn.close()
-    if os.path.exists(db_path):
-        os.unlink(db_path)
 
 
 @pytest.fixture
@@ -37,51 +112,66 @@ def sample_user_id():
     return 123456789
 
 
-@pytest.fixture
+# Read-only; tests that need to change fields take a .copy() (a plain dict)
+_SAMPLE_TASK_DATA = MappingProxyType({
+    'title': 'Тестовая задача',
+    'description': 'Описание тестовой задачи',
+    'priority': 'high',
+    'due_date': '2025-10-10',
+    'due_time': '15:00',
+    'has_specific_time': True,
+    'category': 'работа',
+    'tags': ('важное', 'срочное'),
+    'conditions': (),
+    'reminder_needed': False,
+    'reminder_time': None
+})
+
+
+@pytest.fixture(scope="session")
 def sample_task_data():
     """Sample task data"""
-    return {
-        'title': 'Тестовая задача',
-        'description': 'Описание тестовой задачи',
-        'priority': 'high',
-        'due_date': '2025-10-10',
-        'due_time': '15:00',
-        'has_specific_time': True,
-        'category': 'работа',
-        'tags': ['важное', 'срочное'],
-        'conditions': [],
-        'reminder_needed': False,
-        'reminder_time': None
-    }
+    return _SAMPLE_TASK_DATA
+
+
+class _Bot:
+    """Minimal Telegram Bot stub; patch send_message locally to assert on calls"""
+
+    async def send_message(self, *args, **kwargs):
+        pass
 
 
 @pytest.fixture
 def mock_telegram_bot():
     """Mock Telegram Bot"""
-    bot = AsyncMock()
-    bot.send_message = AsyncMock()
-    return bot
+    return _Bot()
+
+
+# Canned Gemini reply for mock_gemini_api, built once at import
+_GEMINI_PARSED = {
+    "title": "Тестовая задача",
+    "description": "Описание",
+    "conditions": [],
+    "priority": "medium",
+    "context": [],
+    "due_date": "2025-10-10",
+    "due_time": "15:00",
+    "has_specific_date": True,
+    "has_specific_time": True,
+    "category": "работа",
+    "tags": ["тест"],
+    "reminder_needed": False,
+    "reminder_time": None
+}
+_GEMINI_JSON = json.dumps(_GEMINI_PARSED, ensure_ascii=False)
 
 
 @pytest.fixture
-def mock_gemini_api(monkeypatch):
+def mock_gemini_api():
     """Mock Gemini API responses"""
     mock_response = Mock()
-    mock_response.text = '''{
-        "title": "Тестовая задача",
-        "description": "Описание",
-        "conditions": [],
-        "priority": "medium",
-        "context": [],
-        "due_date": "2025-10-10",
-        "due_time": "15:00",
-        "has_specific_date": true,
-        "has_specific_time": true,
-        "category": "работа",
-        "tags": ["тест"],
-        "reminder_needed": false,
-        "reminder_time": null
-    }'''
+    mock_response.text = _GEMINI_JSON
+    mock_response.parsed = _GEMINI_PARSED
 
     mock_model = Mock()
     mock_model.generate_content = Mock(return_value=mock_response)
@@ -90,23 +180,46 @@ def mock_gemini_api(monkeypatch):
         return mock_model
 
     import src.ai.gemini_processor as gp
-    monkeypatch.setattr(gp.genai, 'GenerativeModel', mock_GenerativeModel)
+    original = gp.genai.GenerativeModel
+    gp.genai.GenerativeModel = mock_GenerativeModel
+    yield mock_model
+    gp.genai.GenerativeModel = original
+
 
-    return mock_model
+async def _noop_send_reminder(user_id: int, message: str, reminder_type: str):
+    pass
 
 
 @pytest.fixture
-async def mock_send_reminder():
-    """Mock callback for sending reminders"""
-    async def send_reminder(user_id: int, message: str, reminder_type: str):
-        pass
-    return AsyncMock(side_effect=send_reminder)
+def mock_send_reminder():
+    """No-op callback for sending reminders (no call tracking)"""
+    return _noop_send_reminder
+
+
+@pytest.fixture
+def mock_send_reminder_tracked():
+    """Callback for sending reminders that records calls"""
+    return AsyncMock()
+
+
+@pytest.fixture(scope="module")
+def shared_smart_scheduler():
+    """SmartReminderScheduler built once per module (construction loads config.yaml)"""
+    return SmartReminderScheduler(None, None)
 
 
 @pytest.fixture
-async def smart_scheduler(temp_db, mock_send_reminder):
-    """SmartReminderScheduler with test database"""
-    scheduler = SmartReminderScheduler(temp_db, mock_send_reminder)
+async def smart_scheduler(shared_smart_scheduler, temp_db, mock_send_reminder):
+    """SmartReminderScheduler with test database; shared instance, state reset per test"""
+    scheduler = shared_smart_scheduler
+    scheduler.db = temp_db
+    scheduler.send_reminder_callback = mock_send_reminder
+    scheduler._set_queue([])
+    scheduler.is_running = False
+    scheduler.wake_event = asyncio.Event()
+    scheduler.last_daily_reload = None
+    scheduler.last_cleanup = None
+    scheduler.last_config_reload = None
     yield scheduler
     scheduler.stop_scheduler()
 
@@ -138,8 +251,35 @@ def test_config():
 
 
 @pytest.fixture
-def freeze_time(monkeypatch):
-    """Helper to freeze datetime.now() for tests"""
+def now():
+    """Single reference time for the whole test (one clock read)"""
+    return datetime.now()
+
+
+@pytest.fixture
+def past_time(now):
+    """Already due: 5 minutes before now"""
+    return now - timedelta(minutes=5)
+
+
+@pytest.fixture
+def soon_time(now):
+    """Inside the scheduler's 72h queue window"""
+    return now + timedelta(hours=10)
+
+
+@pytest.fixture
+def far_time(now):
+    """Beyond the 72h queue window (database only)"""
+    return now + timedelta(hours=100)
+
+
+@pytest.fixture
+def frozen_now(request):
+    """Helper to freeze datetime.now() for tests (named apart from freezegun.freeze_time)"""
+    import datetime as _dt
+    original = _dt.datetime
+
     def _freeze(frozen_time: datetime):
         class FrozenDatetime:
             @staticmethod
@@ -150,7 +290,8 @@ def freeze_time(monkeypatch):
             def today():
                 return frozen_time.date()
 
-        from datetime import datetime as dt
-        monkeypatch.setattr('datetime.datetime', FrozenDatetime)
+        # Direct attribute swap; restored once by the finalizer below
+        _dt.datetime = FrozenDatetime
 
+    request.addfinalizer(lambda: setattr(_dt, 'datetime', original))
     return _freeze
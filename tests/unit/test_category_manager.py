@@ -6,10 +6,17 @@ from datetime import datetime
 from src.categories.manager import CategoryManager
 
 
+@pytest.fixture(scope="module")
+def shared_category_manager(session_db):
+    """CategoryManager, созданный один раз на модуль поверх общей БД сессии"""
+    return CategoryManager(session_db)
+
+
 @pytest.fixture
-def category_manager(temp_db):
-    """Фикстура для CategoryManager с временной БД"""
-    return CategoryManager(temp_db)
+def category_manager(shared_category_manager, temp_db):
+    """Фикстура для CategoryManager; temp_db сбрасывает общую БД перед каждым тестом"""
+    assert shared_category_manager.db is temp_db
+    return shared_category_manager
 
 
 @pytest.fixture
@@ -178,6 +185,30 @@ def test_format_tasks_by_category_with_dates(category_manager):
     assert "25.10" in message
 
 
+def test_format_tasks_by_category_uses_user_colors(category_manager, sample_user_id, monkeypatch):
+    """Тест: иконки категорий пользователя берутся одним запросом"""
+    category_manager.create_user_category(sample_user_id, "работа", "💼")
+
+    tasks = [
+        (1, "Задача 1", "high", None, None, "работа", None),
+        (2, "Задача 2", "low", None, None, "работа", None),
+        (3, "Задача 3", "low", None, None, "дом", None),
+    ]
+
+    original = category_manager.db.get_user_categories
+    calls = []
+    monkeypatch.setattr(
+        category_manager.db, 'get_user_categories',
+        lambda user_id: calls.append(user_id) or original(user_id)
+    )
+
+    message = category_manager.format_tasks_by_category(tasks, sample_user_id)
+
+    assert calls == [sample_user_id]
+    assert "💼 Работа" in message
+    assert "🏠 Дом" in message  # Нет у пользователя - иконка по умолчанию
+
+
 def test_get_categories_list_empty(category_manager, sample_user_id):
     """Тест получения списка категорий когда их нет"""
     message = category_manager.get_categories_list(sample_user_id)
@@ -1,64 +1,93 @@
 """
 Unit тесты для ConfigManager
 """
+import copy
+import json
 import pytest
 import yaml
 from pathlib import Path
 from src.config.manager import ConfigManager
 
+# Дампер libyaml (C), если доступен
+_Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
-@pytest.fixture
-def test_config_data():
-    """Тестовые данные конфигурации"""
-    return {
-        'reminders': {
-            'scheduler': {
-                'type': 'smart',
-                'initial_lookahead_hours': 72,
-                'daily_reload_window': [48, 72],
-                'cleanup_time': '23:55',
-                'config_reload_time': '03:00',
-                'old_reminders_retention_days': 7
-            },
-            'check_interval': 1800,
-            'deadline_reminders': [
-                {'days_before': 2, 'time': '09:00'},
-                {'days_before': 1, 'time': '18:00'}
-            ],
-            'time_based_reminders': {
-                'enabled': True,
-                'hours_before': [2, 1],
-                'minutes_before': [30, 15]
-            },
-            'condition_checks': {
-                'default_interval': 43200,
-                'default_time': '12:00'
-            },
-            'morning_reminders': {
-                'enabled': True,
-                'time': '08:00'
-            }
+
+# Тестовые данные конфигурации (не изменять - для правок есть фикстура test_config_data)
+_TEST_CONFIG_DATA = {
+    'reminders': {
+        'scheduler': {
+            'type': 'smart',
+            'initial_lookahead_hours': 72,
+            'daily_reload_window': [48, 72],
+            'cleanup_time': '23:55',
+            'config_reload_time': '03:00',
+            'old_reminders_retention_days': 7
         },
-        'general': {
-            'timezone': 'Europe/London',
-            'min_reminder_interval': 30
+        'check_interval': 1800,
+        'deadline_reminders': [
+            {'days_before': 2, 'time': '09:00'},
+            {'days_before': 1, 'time': '18:00'}
+        ],
+        'time_based_reminders': {
+            'enabled': True,
+            'hours_before': [2, 1],
+            'minutes_before': [30, 15]
+        },
+        'condition_checks': {
+            'default_interval': 43200,
+            'default_time': '12:00'
+        },
+        'morning_reminders': {
+            'enabled': True,
+            'time': '08:00'
         }
+    },
+    'general': {
+        'timezone': 'Europe/London',
+        'min_reminder_interval': 30
     }
+}
+
+
+def _dump_yaml(data) -> bytes:
+    """Сериализовать конфигурацию в YAML (байты для write_bytes)"""
+    return yaml.dump(data, Dumper=_Dumper, allow_unicode=True).encode('utf-8')
+
+
+# Сериализуется один раз при импорте модуля
+_TEST_CONFIG_YAML = _dump_yaml(_TEST_CONFIG_DATA)
 
 
 @pytest.fixture
-def test_config_file(tmp_path, test_config_data):
-    """Создать временный файл конфигурации"""
+def test_config_data():
+    """Тестовые данные конфигурации (изменяемая копия)"""
+    return copy.deepcopy(_TEST_CONFIG_DATA)
+
+
+@pytest.fixture
+def test_config_file(tmp_path):
+    """Создать временный файл конфигурации (для тестов, которые его изменяют)"""
     config_file = tmp_path / "test_config.yaml"
-    with open(config_file, 'w', encoding='utf-8') as f:
-        yaml.dump(test_config_data, f)
+    config_file.write_bytes(_TEST_CONFIG_YAML)
     return config_file
 
 
-def test_load_config_from_file(test_config_file):
-    """Тест загрузки конфигурации из файла"""
-    config_manager = ConfigManager(config_path=test_config_file)
+@pytest.fixture(scope="module")
+def shared_config_file(tmp_path_factory):
+    """Файл конфигурации, общий для read-only тестов модуля"""
+    config_file = tmp_path_factory.mktemp("config") / "test_config.yaml"
+    config_file.write_bytes(_TEST_CONFIG_YAML)
+    return config_file
+
+
+@pytest.fixture(scope="module")
+def config_manager(shared_config_file):
+    """ConfigManager, загруженный один раз на модуль (тесты его не изменяют)"""
+    return ConfigManager(config_path=shared_config_file)
 
+
+def test_load_config_from_file(config_manager):
+    """Тест загрузки конфигурации из файла"""
     assert config_manager.config is not None
     assert 'reminders' in config_manager.config
     assert 'general' in config_manager.config
@@ -75,10 +104,23 @@ def test_load_config_nonexistent_file(tmp_path):
     assert config_manager.get_scheduler_type() == 'smart'
 
 
-def test_get_check_interval(test_config_file):
-    """Тест получения интервала проверки"""
-    config_manager = ConfigManager(config_path=test_config_file)
+def test_default_config_isolated_between_instances(tmp_path):
+    """Тест: изменение конфигурации по умолчанию не портит её для других экземпляров"""
+    nonexistent_file = tmp_path / "nonexistent.yaml"
+
+    first = ConfigManager(config_path=nonexistent_file)
+    second = ConfigManager(config_path=nonexistent_file)
+    assert first.config['reminders'] is not second.config['reminders']
 
+    first.get_deadline_reminders().clear()
+    first.config['reminders']['check_interval'] = 1
+
+    assert len(second.get_deadline_reminders()) == 4
+    assert ConfigManager(config_path=nonexistent_file).get_check_interval() == 3600
+
+
+def test_get_check_interval(config_manager):
+    """Тест получения интервала проверки"""
     assert config_manager.get_check_interval() == 1800
 
 
@@ -89,10 +131,8 @@ def test_get_check_interval_default():
     assert config_manager.get_check_interval() == 3600
 
 
-def test_get_deadline_reminders(test_config_file):
+def test_get_deadline_reminders(config_manager):
     """Тест получения настроек напоминаний о дедлайнах"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     deadline_reminders = config_manager.get_deadline_reminders()
 
     assert len(deadline_reminders) == 2
@@ -102,52 +142,38 @@ def test_get_deadline_reminders(test_config_file):
     assert deadline_reminders[1]['time'] == '18:00'
 
 
-def test_get_condition_check_interval(test_config_file):
+def test_get_condition_check_interval(config_manager):
     """Тест получения интервала проверки условий"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.get_condition_check_interval() == 43200
 
 
-def test_get_condition_check_time(test_config_file):
+def test_get_condition_check_time(config_manager):
     """Тест получения времени проверки условий"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.get_condition_check_time() == '12:00'
 
 
-def test_get_morning_reminder_time(test_config_file):
+def test_get_morning_reminder_time(config_manager):
     """Тест получения времени утренних напоминаний"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.get_morning_reminder_time() == '08:00'
 
 
-def test_is_morning_reminders_enabled(test_config_file):
+def test_is_morning_reminders_enabled(config_manager):
     """Тест проверки включения утренних напоминаний"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.is_morning_reminders_enabled() is True
 
 
-def test_get_timezone(test_config_file):
+def test_get_timezone(config_manager):
     """Тест получения временной зоны"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.get_timezone() == 'Europe/London'
 
 
-def test_get_min_reminder_interval(test_config_file):
+def test_get_min_reminder_interval(config_manager):
     """Тест получения минимального интервала напоминаний"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.get_min_reminder_interval() == 30
 
 
-def test_get_time_based_reminders_config(test_config_file):
+def test_get_time_based_reminders_config(config_manager):
     """Тест получения конфигурации напоминаний с точным временем"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     config = config_manager.get_time_based_reminders_config()
 
     assert config['enabled'] is True
@@ -155,42 +181,32 @@ def test_get_time_based_reminders_config(test_config_file):
     assert config['minutes_before'] == [30, 15]
 
 
-def test_is_time_based_reminders_enabled(test_config_file):
+def test_is_time_based_reminders_enabled(config_manager):
     """Тест проверки включения напоминаний с точным временем"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.is_time_based_reminders_enabled() is True
 
 
-def test_get_time_based_hours_before(test_config_file):
+def test_get_time_based_hours_before(config_manager):
     """Тест получения интервалов в часах для напоминаний"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     hours_before = config_manager.get_time_based_hours_before()
 
     assert hours_before == [2, 1]
 
 
-def test_get_time_based_minutes_before(test_config_file):
+def test_get_time_based_minutes_before(config_manager):
     """Тест получения интервалов в минутах для напоминаний"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     minutes_before = config_manager.get_time_based_minutes_before()
 
     assert minutes_before == [30, 15]
 
 
-def test_get_scheduler_type(test_config_file):
+def test_get_scheduler_type(config_manager):
     """Тест получения типа планировщика"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     assert config_manager.get_scheduler_type() == 'smart'
 
 
-def test_get_scheduler_config(test_config_file):
+def test_get_scheduler_config(config_manager):
     """Тест получения полной конфигурации планировщика"""
-    config_manager = ConfigManager(config_path=test_config_file)
-
     scheduler_config = config_manager.get_scheduler_config()
 
     assert scheduler_config['type'] == 'smart'
@@ -210,8 +226,7 @@ def test_reload_config(test_config_file, test_config_data):
 
     # Изменяем файл конфигурации
     test_config_data['reminders']['check_interval'] = 2400
-    with open(test_config_file, 'w', encoding='utf-8') as f:
-        yaml.dump(test_config_data, f)
+    test_config_file.write_bytes(_dump_yaml(test_config_data))
 
     # Перезагружаем конфигурацию
     config_manager.reload_config()
@@ -220,11 +235,75 @@ def test_reload_config(test_config_file, test_config_data):
     assert config_manager.get_check_interval() == 2400
 
 
+def test_reload_config_resets_cached_reminder_settings(test_config_file, test_config_data):
+    """Тест сброса закэшированных настроек напоминаний при перезагрузке"""
+    config_manager = ConfigManager(config_path=test_config_file)
+
+    # Первое обращение кэширует значение
+    assert config_manager.get_time_based_hours_before() == [2, 1]
+
+    test_config_data['reminders']['time_based_reminders']['hours_before'] = [5]
+    test_config_file.write_bytes(_dump_yaml(test_config_data))
+
+    # До перезагрузки используется закэшированное значение
+    assert config_manager.get_time_based_hours_before() == [2, 1]
+
+    config_manager.reload_config()
+
+    assert config_manager.get_time_based_hours_before() == [5]
+
+
+def test_parsed_config_shared_between_instances(test_config_file):
+    """Тест: неизменённый файл разбирается один раз на все экземпляры"""
+    from src.config.manager import _parse_yaml_cached
+
+    first = ConfigManager(config_path=test_config_file)
+    misses = _parse_yaml_cached.cache_info().misses
+    second = ConfigManager(config_path=test_config_file)
+
+    assert _parse_yaml_cached.cache_info().misses == misses
+    assert second.config == first.config
+    assert second.config is not first.config
+
+
+def test_config_isolated_between_instances(test_config_file):
+    """Тест: изменение конфигурации одного экземпляра не видно другому"""
+    first = ConfigManager(config_path=test_config_file)
+    second = ConfigManager(config_path=test_config_file)
+
+    first.get_deadline_reminders().append({'days_before': 5, 'time': '08:00'})
+    first.config['reminders']['check_interval'] = 1
+
+    assert len(second.get_deadline_reminders()) == 2
+    assert second.config['reminders']['check_interval'] == 1800
+    assert len(ConfigManager(config_path=test_config_file).get_deadline_reminders()) == 2
+
+
+def test_load_json_config(tmp_path, test_config_data):
+    """Тест загрузки конфигурации в формате JSON (JSON - подмножество YAML)"""
+    config_file = tmp_path / "test_config.yaml"
+    config_file.write_text(json.dumps(test_config_data), encoding='utf-8')
+
+    config_manager = ConfigManager(config_path=config_file)
+
+    assert config_manager.config == test_config_data
+    assert config_manager.get_timezone() == 'Europe/London'
+
+
+def test_load_flow_yaml_config(tmp_path):
+    """Тест: flow-стиль YAML, не являющийся JSON, разбирается YAML-парсером"""
+    config_file = tmp_path / "test_config.yaml"
+    config_file.write_text("{general: {timezone: Europe/Paris}}", encoding='utf-8')
+
+    config_manager = ConfigManager(config_path=config_file)
+
+    assert config_manager.get_timezone() == 'Europe/Paris'
+
+
 def test_invalid_yaml_file(tmp_path):
     """Тест загрузки невалидного YAML файла"""
     invalid_config = tmp_path / "invalid.yaml"
-    with open(invalid_config, 'w') as f:
-        f.write("{ invalid yaml content : [ unclosed")
+    invalid_config.write_bytes(b"{ invalid yaml content : [ unclosed")
 
     config_manager = ConfigManager(config_path=invalid_config)
 
@@ -254,8 +333,7 @@ def test_partial_config(tmp_path):
         }
     }
 
-    with open(partial_config, 'w', encoding='utf-8') as f:
-        yaml.dump(partial_data, f)
+    partial_config.write_bytes(_dump_yaml(partial_data))
 
     config_manager = ConfigManager(config_path=partial_config)
 
@@ -267,31 +345,52 @@ def test_partial_config(tmp_path):
     assert config_manager.get_scheduler_type() == 'smart'
 
 
-def test_default_config_structure():
-    """Тест структуры конфигурации по умолчанию"""
-    config_manager = ConfigManager(config_path="/nonexistent/path")
+# Обязательные ключи конфигурации по умолчанию (кортежи: порядок сбора тестов стабилен)
+ROOT_KEYS = ('reminders', 'general')
+REMINDERS_KEYS = (
+    'scheduler', 'check_interval', 'deadline_reminders',
+    'time_based_reminders', 'condition_checks', 'morning_reminders',
+)
+SCHEDULER_KEYS = ('type', 'initial_lookahead_hours', 'daily_reload_window')
 
-    default_config = config_manager._get_default_config()
 
-    # Проверяем наличие всех основных секций
-    assert 'reminders' in default_config
-    assert 'general' in default_config
+@pytest.fixture(scope="module")
+def default_config():
+    """Конфигурация по умолчанию"""
+    return ConfigManager(config_path="/nonexistent/path")._get_default_config()
 
-    # Проверяем структуру reminders
-    assert 'scheduler' in default_config['reminders']
-    assert 'check_interval' in default_config['reminders']
-    assert 'deadline_reminders' in default_config['reminders']
-    assert 'time_based_reminders' in default_config['reminders']
-    assert 'condition_checks' in default_config['reminders']
-    assert 'morning_reminders' in default_config['reminders']
 
-    # Проверяем структуру scheduler
-    scheduler = default_config['reminders']['scheduler']
-    assert 'type' in scheduler
-    assert 'initial_lookahead_hours' in scheduler
-    assert 'daily_reload_window' in scheduler
+@pytest.mark.parametrize("key", ROOT_KEYS)
+def test_default_config_has_section(key, default_config):
+    """Тест наличия основных секций в конфигурации по умолчанию"""
+    assert key in default_config
+
+
+@pytest.mark.parametrize("key", REMINDERS_KEYS)
+def test_default_reminders_has_key(key, default_config):
+    """Тест структуры reminders"""
+    assert key in default_config['reminders']
 
-    # Проверяем значения по умолчанию
+
+@pytest.mark.parametrize("key", SCHEDULER_KEYS)
+def test_default_scheduler_has_key(key, default_config):
+    """Тест структуры scheduler"""
+    assert key in default_config['reminders']['scheduler']
+
+
+def test_get_default_config_returns_copy(tmp_path):
+    """Тест: изменение результата _get_default_config не меняет значения по умолчанию"""
+    manager = ConfigManager(config_path=tmp_path / "nonexistent.yaml")
+
+    manager._get_default_config()['reminders']['scheduler']['type'] = 'polling'
+
+    assert manager._get_default_config()['reminders']['scheduler']['type'] == 'smart'
+    assert ConfigManager(config_path=tmp_path / "nonexistent.yaml").get_scheduler_type() == 'smart'
+
+
+def test_default_config_values(default_config):
+    """Тест значений конфигурации по умолчанию"""
+    scheduler = default_config['reminders']['scheduler']
     assert scheduler['type'] == 'smart'
     assert scheduler['initial_lookahead_hours'] == 72
     assert default_config['general']['timezone'] == 'Europe/Moscow'
@@ -308,3 +407,15 @@ def test_missing_nested_keys():
     assert config_manager.get_check_interval() == 3600
     assert config_manager.get_deadline_reminders() == []
     assert config_manager.is_morning_reminders_enabled() is True
+
+
+def test_config_setter_refreshes_cached_sections(config_manager):
+    """Тест: изменённая копия, присвоенная через config, видна в get_*"""
+    manager = ConfigManager(config_path=config_manager.config_path)
+    assert manager.get_check_interval() == 1800
+
+    updated = copy.deepcopy(manager.config)
+    updated['reminders']['check_interval'] = 600
+    manager.config = updated
+
+    assert manager.get_check_interval() == 600
@@ -3,22 +3,55 @@ Unit тесты для DatabaseManager
 """
 import pytest
 from datetime import datetime, timedelta
+from freezegun import freeze_time
 
+# Фиксированное "сейчас" для тестов, зависящих от времени
+FROZEN_NOW = datetime(2025, 10, 10, 12, 0, 0)
 
-def test_database_initialization(temp_db):
+
+def test_database_initialization(temp_db, cur):
     """Тест инициализации базы данных"""
     assert temp_db.conn is not None
 
     # Проверяем, что таблицы созданы
-    cursor = temp_db.conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = {row[0] for row in cursor.fetchall()}
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cur.fetchall()}
 
     assert 'tasks' in tables
     assert 'reminders' in tables
     assert 'categories' in tables
 
 
+def test_file_database_persists_after_reopen(file_db, sample_user_id, sample_task_data):
+    """Тест сохранения данных в файловой БД после переподключения"""
+    from src.database.models import DatabaseManager
+
+    task_id = file_db.save_task(sample_user_id, "Задача", sample_task_data)
+
+    reopened = DatabaseManager(file_db.db_path)
+    try:
+        task = reopened.get_task_by_id(task_id)
+        assert task is not None
+        assert task[2] == sample_task_data['title']
+    finally:
+        reopened.conn.close()
+
+
+@pytest.mark.parametrize("wal, expected_mode", [
+    pytest.param(False, "delete", id="default"),
+    pytest.param(True, "wal", id="wal"),
+])
+def test_file_database_journal_mode(tmp_path, wal, expected_mode):
+    """Тест: WAL включается только по явному запросу"""
+    from src.database.models import DatabaseManager
+
+    db = DatabaseManager(str(tmp_path / "journal.db"), wal=wal)
+    try:
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == expected_mode
+    finally:
+        db.conn.close()
+
+
 def test_save_and_get_task(temp_db, sample_user_id, sample_task_data):
     """Тест сохранения и получения задачи"""
     # Сохраняем задачу
@@ -38,11 +71,8 @@ def test_save_and_get_task(temp_db, sample_user_id, sample_task_data):
 def test_get_tasks_by_date(temp_db, sample_user_id, sample_task_data):
     """Тест получения задач по дате"""
     # Создаём несколько задач
-    task_data_1 = sample_task_data.copy()
-    task_data_1['due_date'] = '2025-10-10'
-
-    task_data_2 = sample_task_data.copy()
-    task_data_2['due_date'] = '2025-10-11'
+    task_data_1 = {**sample_task_data, 'due_date': '2025-10-10'}
+    task_data_2 = {**sample_task_data, 'due_date': '2025-10-11'}
 
     temp_db.save_task(sample_user_id, "Задача 1", task_data_1)
     temp_db.save_task(sample_user_id, "Задача 2", task_data_2)
@@ -54,7 +84,7 @@ def test_get_tasks_by_date(temp_db, sample_user_id, sample_task_data):
     assert tasks[0][1] == task_data_1['title']  # Index 1 is title
 
 
-def test_mark_task_done(temp_db, sample_user_id, sample_task_data):
+def test_mark_task_done(temp_db, sample_user_id, sample_task_data, cur):
     """Тест отметки задачи как выполненной"""
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
@@ -63,38 +93,56 @@ def test_mark_task_done(temp_db, sample_user_id, sample_task_data):
     assert result is True
 
     # Проверяем статус
-    cursor = temp_db.conn.cursor()
-    cursor.execute("SELECT status FROM tasks WHERE id = ?", (task_id,))
-    status = cursor.fetchone()[0]
+    cur.execute("SELECT status FROM tasks WHERE id = ?", (task_id,))
+    status = cur.fetchone()[0]
 
     assert status == 'done'
 
 
-def test_add_reminder(temp_db, sample_user_id, sample_task_data):
+@freeze_time(FROZEN_NOW)
+def test_add_reminder(temp_db, sample_user_id, sample_task_data, cur):
     """Тест добавления напоминания"""
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
-    reminder_time = datetime.now() + timedelta(hours=1)
+    reminder_time = FROZEN_NOW + timedelta(hours=1)
     temp_db.add_reminder(task_id, sample_user_id, reminder_time, 'deadline')
 
     # Проверяем, что напоминание создано
-    cursor = temp_db.conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM reminders WHERE task_id = ?", (task_id,))
-    count = cursor.fetchone()[0]
+    cur.execute("SELECT EXISTS(SELECT 1 FROM reminders WHERE task_id = ?)", (task_id,))
+    exists = cur.fetchone()[0]
 
-    assert count == 1
+    assert exists == 1
+
+
+@freeze_time(FROZEN_NOW)
+def test_add_reminders_bulk(temp_db, sample_user_id, sample_task_data, cur):
+    """Тест пакетного добавления напоминаний"""
+    task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
+    now = FROZEN_NOW
+    reminder_ids = temp_db.add_reminders_bulk([
+        (task_id, sample_user_id, now + timedelta(hours=1), 'deadline'),
+        (task_id, sample_user_id, now + timedelta(hours=2), 'time_based'),
+    ])
 
+    assert len(reminder_ids) == 2
+    assert reminder_ids[0] < reminder_ids[1]
+
+    cur.execute("SELECT id, reminder_type FROM reminders WHERE task_id = ? ORDER BY id", (task_id,))
+    assert cur.fetchall() == [(reminder_ids[0], 'deadline'), (reminder_ids[1], 'time_based')]
+
+
+@freeze_time(FROZEN_NOW)
 def test_get_future_reminders(temp_db, sample_user_id, sample_task_data):
     """Тест получения будущих напоминаний"""
     # Создаём задачу
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
     # Добавляем напоминания в разное время
-    now = datetime.now()
-    temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=1), 'deadline')
-    temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=50), 'deadline')
-    temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=100), 'deadline')
+    now = FROZEN_NOW
+    temp_db.add_reminders_bulk([
+        (task_id, sample_user_id, now + timedelta(hours=h), 'deadline') for h in (1, 50, 100)
+    ])
 
     # Получаем напоминания на 72 часа
     reminders = temp_db.get_future_reminders(hours=72)
@@ -103,14 +151,15 @@ def test_get_future_reminders(temp_db, sample_user_id, sample_task_data):
     assert len(reminders) == 2
 
 
+@freeze_time(FROZEN_NOW)
 def test_get_future_reminders_with_window(temp_db, sample_user_id, sample_task_data):
     """Тест получения напоминаний в окне времени"""
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
-    now = datetime.now()
-    temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=10), 'deadline')
-    temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=50), 'deadline')
-    temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=60), 'deadline')
+    now = FROZEN_NOW
+    temp_db.add_reminders_bulk([
+        (task_id, sample_user_id, now + timedelta(hours=h), 'deadline') for h in (10, 50, 60)
+    ])
 
     # Получаем напоминания в окне 48-72 часа
     reminders = temp_db.get_future_reminders(hours=72, from_hours=48)
@@ -119,18 +168,18 @@ def test_get_future_reminders_with_window(temp_db, sample_user_id, sample_task_d
     assert len(reminders) == 2
 
 
-def test_delete_old_reminders(temp_db, sample_user_id, sample_task_data):
+@freeze_time(FROZEN_NOW)
+def test_delete_old_reminders(temp_db, sample_user_id, sample_task_data, cur):
     """Тест удаления старых напоминаний"""
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
     # Создаём старое отправленное напоминание
-    old_time = datetime.now() - timedelta(days=10)
+    old_time = FROZEN_NOW - timedelta(days=10)
     temp_db.add_reminder(task_id, sample_user_id, old_time, 'deadline')
 
     # Получаем ID напоминания
-    cursor = temp_db.conn.cursor()
-    cursor.execute("SELECT id FROM reminders WHERE task_id = ?", (task_id,))
-    reminder_id = cursor.fetchone()[0]
+    cur.execute("SELECT id FROM reminders WHERE task_id = ?", (task_id,))
+    reminder_id = cur.fetchone()[0]
 
     # Отмечаем как отправленное
     temp_db.mark_reminder_sent(reminder_id)
@@ -154,6 +203,21 @@ def test_create_and_get_category(temp_db, sample_user_id):
     assert any(cat[1] == "работа" for cat in categories)
 
 
+def test_get_tasks_by_category_with_display(temp_db, sample_user_id, sample_task_data):
+    """Тест получения задач категории вместе с иконкой"""
+    task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
+
+    # Категория еще не создана - иконки нет
+    rows = temp_db.get_tasks_by_category_with_display(sample_user_id, "работа")
+    assert rows == [(task_id, 'Тестовая задача', 'high', '2025-10-10', None)]
+
+    temp_db.create_category(sample_user_id, "работа", "🔷")
+    temp_db.create_category(sample_user_id + 1, "работа", "💼")
+
+    rows = temp_db.get_tasks_by_category_with_display(sample_user_id, "работа")
+    assert rows == [(task_id, 'Тестовая задача', 'high', '2025-10-10', '🔷')]
+
+
 def test_user_isolation(temp_db, sample_task_data):
     """Тест изоляции данных пользователей"""
     user1_id = 111
@@ -180,21 +244,15 @@ def test_user_isolation(temp_db, sample_task_data):
 def test_get_all_active_tasks(temp_db, sample_user_id, sample_task_data):
     """Тест получения всех активных задач"""
     # Создаём несколько активных задач с разными датами
-    task_data_1 = sample_task_data.copy()
-    task_data_1['due_date'] = '2025-10-10'
-    task_data_1['priority'] = 'high'
-
-    task_data_2 = sample_task_data.copy()
-    task_data_2['due_date'] = '2025-10-15'
-    task_data_2['priority'] = 'medium'
-
-    task_data_3 = sample_task_data.copy()
-    task_data_3['due_date'] = None
-    task_data_3['priority'] = 'low'
+    task_data_1 = {**sample_task_data, 'due_date': '2025-10-10', 'priority': 'high'}
+    task_data_2 = {**sample_task_data, 'due_date': '2025-10-15', 'priority': 'medium'}
+    task_data_3 = {**sample_task_data, 'due_date': None, 'priority': 'low'}
 
-    task1_id = temp_db.save_task(sample_user_id, "Задача 1", task_data_1)
-    task2_id = temp_db.save_task(sample_user_id, "Задача 2", task_data_2)
-    task3_id = temp_db.save_task(sample_user_id, "Задача 3", task_data_3)
+    task1_id, task2_id, task3_id = temp_db.save_tasks_bulk(sample_user_id, [
+        ("Задача 1", task_data_1),
+        ("Задача 2", task_data_2),
+        ("Задача 3", task_data_3),
+    ])
 
     # Получаем все активные задачи
     tasks = temp_db.get_all_active_tasks(sample_user_id)
@@ -216,12 +274,14 @@ def test_get_all_active_tasks(temp_db, sample_user_id, sample_task_data):
     assert len(tasks_with_dates) == 2
     assert len(tasks_without_dates) == 1
 
-    # Проверяем, что задачи с датами идут первыми
-    for i, task in enumerate(tasks):
-        if task[4] is None:  # Если нашли задачу без даты
-            # Все предыдущие должны иметь дату
-            for prev_task in tasks[:i]:
-                assert prev_task[4] is not None
+    # Проверяем, что задачи с датами идут первыми:
+    # после первой задачи без даты задач с датой быть не должно
+    seen_none = False
+    for task in tasks:
+        if task[4] is None:
+            seen_none = True
+        elif seen_none:
+            pytest.fail("Задача с датой идёт после задачи без даты")
 
 
 def test_get_all_active_tasks_excludes_completed(temp_db, sample_user_id, sample_task_data):
@@ -0,0 +1,72 @@
+"""
+Unit тесты для TokenBucket
+"""
+import pytest
+from src.telegram_handlers.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Управляемые часы: sleep продвигает время вместо реального ожидания"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+async def test_burst_within_capacity_not_delayed(clock):
+    """Тест: запросы в пределах ёмкости проходят без ожидания"""
+    bucket = TokenBucket(rate=1, capacity=5, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        async with bucket:
+            pass
+
+    assert clock.sleeps == []
+    assert bucket.tokens == pytest.approx(0)
+
+
+async def test_waits_for_refill_when_empty(clock):
+    """Тест: при пустом bucket запрос ждёт пополнения"""
+    bucket = TokenBucket(rate=20, capacity=1, clock=clock, sleep=clock.sleep)
+
+    await bucket.acquire()
+    await bucket.acquire()
+
+    # Один токен пополняется за 1/20 секунды
+    assert clock.sleeps == [pytest.approx(0.05)]
+    assert bucket.tokens == pytest.approx(0)
+
+
+async def test_refill_capped_at_capacity(clock):
+    """Тест: за время простоя накапливается не больше capacity токенов"""
+    bucket = TokenBucket(rate=10, capacity=3, clock=clock, sleep=clock.sleep)
+
+    await bucket.acquire()
+    clock.now += 60
+    await bucket.acquire()
+
+    assert bucket.tokens == pytest.approx(2)
+    assert clock.sleeps == []
+
+
+async def test_call_takes_token(clock):
+    """Тест: call выполняет запрос и расходует токен"""
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+
+    async def send(text, parse_mode=None):
+        return (text, parse_mode)
+
+    assert await bucket.call(send, "привет", parse_mode='HTML') == ("привет", 'HTML')
+    assert bucket.tokens == pytest.approx(1)
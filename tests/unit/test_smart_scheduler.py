@@ -2,33 +2,39 @@
 Unit тесты для SmartReminderScheduler
 """
 import pytest
-from datetime import datetime, timedelta
+from datetime import timedelta
+from freezegun import freeze_time
 from src.reminders.smart_scheduler import Reminder
 
 
-def test_reminder_sorting():
-    """Тест сортировки напоминаний по времени"""
-    now = datetime.now()
+# Смещения напоминаний (в часах) и ожидаемый порядок их ID
+ORDERING_CASES = [
+    pytest.param([3, 1, 2], [2, 3, 1], id="three"),
+    pytest.param([5, 2], [2, 1], id="two"),
+]
+
 
-    r1 = Reminder(1, 1, 123, now + timedelta(hours=3), 'deadline', 'Задача 1')
-    r2 = Reminder(2, 2, 123, now + timedelta(hours=1), 'deadline', 'Задача 2')
-    r3 = Reminder(3, 3, 123, now + timedelta(hours=2), 'deadline', 'Задача 3')
+def _make_reminders(now, offsets):
+    """Напоминания с ID 1..N через указанное число часов"""
+    return [
+        Reminder(i, i, 123, now + timedelta(hours=h), 'deadline', f'Задача {i}')
+        for i, h in enumerate(offsets, start=1)
+    ]
 
-    reminders = [r1, r2, r3]
-    reminders.sort()
 
-    assert reminders[0].id == 2  # Ближайшее через 1 час
-    assert reminders[1].id == 3  # Через 2 часа
-    assert reminders[2].id == 1  # Через 3 часа
+@pytest.mark.parametrize("offsets, expected_ids", ORDERING_CASES)
+def test_reminder_sorting(now, offsets, expected_ids):
+    """Тест сортировки напоминаний по времени"""
+    reminders = sorted(_make_reminders(now, offsets))
+
+    assert [r.id for r in reminders] == expected_ids
 
 
-@pytest.mark.asyncio
-async def test_load_initial_reminders(smart_scheduler, temp_db, sample_user_id, sample_task_data):
+async def test_load_initial_reminders(smart_scheduler, temp_db, sample_user_id, sample_task_data, now):
     """Тест загрузки начальных напоминаний"""
     # Создаём задачу с напоминаниями
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
-    now = datetime.now()
     temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=10), 'deadline')
     temp_db.add_reminder(task_id, sample_user_id, now + timedelta(hours=20), 'deadline')
 
@@ -39,73 +45,66 @@ async def test_load_initial_reminders(smart_scheduler, temp_db, sample_user_id,
     assert smart_scheduler.last_daily_reload is not None
 
 
-def test_should_reload_db(smart_scheduler):
-    """Тест проверки необходимости перезагрузки БД"""
+@pytest.mark.parametrize("method, attr, last_days_ago, last_hour, hour, minute, expected", [
     # Сразу после старта - не нужно
-    assert smart_scheduler.should_reload_db(datetime.now()) is False
-
-    # Через 25 часов - нужно
-    smart_scheduler.last_daily_reload = datetime.now() - timedelta(hours=25)
-    assert smart_scheduler.should_reload_db(datetime.now()) is True
-
-
-def test_should_cleanup_db(smart_scheduler):
-    """Тест проверки необходимости очистки БД"""
-    now = datetime.now()
-
-    # В 23:56 сегодня - нужно (last_cleanup был вчера)
-    cleanup_time = now.replace(hour=23, minute=56, second=0)
-    smart_scheduler.last_cleanup = (now - timedelta(days=1)).replace(hour=0, minute=0)
-    assert smart_scheduler.should_cleanup_db(cleanup_time) is True
-
-    # В 10:00 - не нужно
-    morning_time = now.replace(hour=10, minute=0, second=0)
-    smart_scheduler.last_cleanup = now.replace(hour=0, minute=0)  # Reset to today
-    assert smart_scheduler.should_cleanup_db(morning_time) is False
-
-
-def test_should_reload_config(smart_scheduler):
-    """Тест проверки необходимости перезагрузки конфига"""
-    now = datetime.now()
-
-    # В 03:02 сегодня - нужно (если не было сегодня)
-    config_time = now.replace(hour=3, minute=2, second=0)
-    smart_scheduler.last_config_reload = (now - timedelta(days=1)).replace(hour=0, minute=0)
-    assert smart_scheduler.should_reload_config(config_time) is True
-
-    # В 10:00 - не нужно
-    morning_time = now.replace(hour=10, minute=0, second=0)
-    smart_scheduler.last_config_reload = now.replace(hour=3, minute=0)
-    assert smart_scheduler.should_reload_config(morning_time) is False
-
-
-def test_add_reminder_to_queue(smart_scheduler):
+    pytest.param("should_reload_db", "last_daily_reload", None, None, 12, 0, False, id="reload_db_after_start"),
+    # Через 25 часов - нужно, через 23 - нет
+    pytest.param("should_reload_db", "last_daily_reload", 1, 11, 12, 0, True, id="reload_db_after_25h"),
+    pytest.param("should_reload_db", "last_daily_reload", 1, 13, 12, 0, False, id="reload_db_after_23h"),
+    # В 23:56 - нужно (last_cleanup был вчера), в 10:00 - нет
+    pytest.param("should_cleanup_db", "last_cleanup", 1, 0, 23, 56, True, id="cleanup_at_23_56"),
+    pytest.param("should_cleanup_db", "last_cleanup", 0, 0, 10, 0, False, id="cleanup_at_10_00"),
+    # В 03:02 - нужно (если не было сегодня), в 10:00 - нет
+    pytest.param("should_reload_config", "last_config_reload", 1, 0, 3, 2, True, id="config_at_03_02"),
+    pytest.param("should_reload_config", "last_config_reload", 0, 3, 10, 0, False, id="config_at_10_00"),
+])
+def test_should_run_periodic_task(smart_scheduler, now, method, attr, last_days_ago, last_hour, hour, minute, expected):
+    """Тест проверок периодических задач планировщика (перезагрузка БД, очистка, конфиг)"""
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if last_days_ago is not None:
+        last = (today - timedelta(days=last_days_ago)).replace(hour=last_hour)
+        setattr(smart_scheduler, attr, last)
+
+    check_time = today.replace(hour=hour, minute=minute)
+    assert getattr(smart_scheduler, method)(check_time) is expected
+
+
+@pytest.mark.parametrize("offsets, expected_ids", ORDERING_CASES)
+def test_add_reminder_to_queue(smart_scheduler, now, offsets, expected_ids):
     """Тест добавления напоминания в очередь"""
-    now = datetime.now()
+    for count, reminder in enumerate(_make_reminders(now, offsets), start=1):
+        smart_scheduler.add_reminder_to_queue(reminder)
+        assert len(smart_scheduler.reminder_queue) == count
 
-    r1 = Reminder(1, 1, 123, now + timedelta(hours=5), 'deadline', 'Задача 1')
-    r2 = Reminder(2, 2, 123, now + timedelta(hours=2), 'deadline', 'Задача 2')
+    # Ближайшее - в начале очереди, порядок отправки - по времени
+    assert smart_scheduler.reminder_queue[0].id == expected_ids[0]
+    assert [r.id for r in smart_scheduler.ordered_reminders()] == expected_ids
 
-    smart_scheduler.add_reminder_to_queue(r1)
-    assert len(smart_scheduler.reminder_queue) == 1
 
-    smart_scheduler.add_reminder_to_queue(r2)
-    assert len(smart_scheduler.reminder_queue) == 2
+async def test_contains_task(smart_scheduler, now):
+    """Тест индекса задач в очереди"""
+    past = now - timedelta(minutes=1)
 
-    # Проверяем, что очередь отсортирована
-    assert smart_scheduler.reminder_queue[0].id == 2  # Ближайшее
+    smart_scheduler.add_reminder_to_queue(Reminder(1, 7, 123, past, 'deadline', 'Задача'))
+    smart_scheduler.add_reminder_to_queue(Reminder(2, 7, 123, past + timedelta(days=2), 'deadline', 'Задача'))
+    assert smart_scheduler.contains_task(7)
+    assert not smart_scheduler.contains_task(8)
 
+    # Первое напоминание отправлено, второе ещё в очереди
+    await smart_scheduler.process_due_reminders()
+    assert smart_scheduler.contains_task(7)
 
-def test_get_next_wake_time(smart_scheduler):
-    """Тест вычисления времени следующего пробуждения"""
-    now = datetime.now()
 
+def test_get_next_wake_time(smart_scheduler, now):
+    """Тест вычисления времени следующего пробуждения"""
     # Добавляем напоминание через 2 часа
     r = Reminder(1, 1, 123, now + timedelta(hours=2), 'deadline', 'Задача')
-    smart_scheduler.add_reminder_to_queue(r)
+    smart_scheduler._set_queue([r])
 
-    # Время пробуждения должно быть через 2 часа (или раньше если есть системное событие)
-    wake_time = smart_scheduler.get_next_wake_time()
+    # Время пробуждения должно быть через 2 часа (или раньше если есть системное событие);
+    # часы заморожены на now, чтобы планировщик считал от того же момента
+    with freeze_time(now):
+        wake_time = smart_scheduler.get_next_wake_time()
 
     # Должно быть в будущем
     assert wake_time > now
@@ -114,32 +113,31 @@ def test_get_next_wake_time(smart_scheduler):
     assert wake_time <= now + timedelta(hours=2, minutes=1)
 
 
-def test_format_reminder_message(smart_scheduler):
+@pytest.mark.parametrize("kind, needle", [
+    ("deadline", "дедлайн"),
+    ("morning", "утро"),
+    ("time_based", "событие"),
+])
+def test_format_reminder_message(smart_scheduler, kind, needle):
     """Тест форматирования сообщений"""
-    message = smart_scheduler._format_reminder_message("Тестовая задача", "deadline")
+    message = smart_scheduler._format_reminder_message("Тестовая задача", kind)
     assert "Тестовая задача" in message
-    assert "дедлайн" in message.lower()
-
-    message = smart_scheduler._format_reminder_message("Задача", "morning")
-    assert "утро" in message.lower()
+    assert needle in message.lower()
 
-    message = smart_scheduler._format_reminder_message("Задача", "time_based")
-    assert "событие" in message.lower()
 
-
-@pytest.mark.asyncio
-async def test_process_due_reminders(smart_scheduler, mock_send_reminder, temp_db, sample_user_id, sample_task_data):
+async def test_process_due_reminders(smart_scheduler, mock_send_reminder_tracked, temp_db, sample_user_id, sample_task_data, past_time):
     """Тест обработки просроченных напоминаний"""
+    smart_scheduler.send_reminder_callback = mock_send_reminder_tracked
+
     # Создаём задачу
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
     # Создаём напоминание в прошлом
-    past_time = datetime.now() - timedelta(minutes=5)
     temp_db.add_reminder(task_id, sample_user_id, past_time, 'deadline')
 
     # Загружаем (хотя оно в прошлом, но для теста добавим вручную)
     r = Reminder(1, task_id, sample_user_id, past_time, 'deadline', 'Задача')
-    smart_scheduler.reminder_queue.append(r)
+    smart_scheduler._set_queue([r])
 
     # Обрабатываем
     await smart_scheduler.process_due_reminders()
@@ -148,32 +146,47 @@ async def test_process_due_reminders(smart_scheduler, mock_send_reminder, temp_d
     assert len(smart_scheduler.reminder_queue) == 0
 
     # Callback должен был быть вызван
-    mock_send_reminder.assert_called_once()
+    mock_send_reminder_tracked.assert_called_once()
 
 
-def test_schedule_task_reminder_within_72h(smart_scheduler, temp_db, sample_user_id, sample_task_data):
+def test_schedule_task_reminder_within_72h(smart_scheduler, temp_db, sample_user_id, sample_task_data, soon_time):
     """Тест планирования напоминания в пределах 72 часов"""
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
-    reminder_time = datetime.now() + timedelta(hours=10)
-
     # Планируем напоминание
-    smart_scheduler.schedule_task_reminder(task_id, sample_user_id, reminder_time, 'deadline')
+    smart_scheduler.schedule_task_reminder(task_id, sample_user_id, soon_time, 'deadline')
 
     # Должно появиться в очереди
     assert len(smart_scheduler.reminder_queue) > 0
 
 
-def test_schedule_task_reminder_beyond_72h(smart_scheduler, temp_db, sample_user_id, sample_task_data):
+def test_schedule_task_reminder_beyond_72h(smart_scheduler, temp_db, sample_user_id, sample_task_data, far_time):
     """Тест планирования напоминания за пределами 72 часов"""
     task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
 
-    reminder_time = datetime.now() + timedelta(hours=100)
-
     # Планируем напоминание
-    smart_scheduler.schedule_task_reminder(task_id, sample_user_id, reminder_time, 'deadline')
+    smart_scheduler.schedule_task_reminder(task_id, sample_user_id, far_time, 'deadline')
 
     # НЕ должно появиться в очереди (только в БД)
     # Проверяем БД
     reminders = temp_db.get_future_reminders(hours=200)
     assert len(reminders) > 0
+
+
+def test_schedule_task_reminders_bulk(smart_scheduler, temp_db, sample_user_id, sample_task_data, now):
+    """Тест пакетного планирования: в очередь попадают только напоминания < 72 часов"""
+    task_id = temp_db.save_task(sample_user_id, "Задача", sample_task_data)
+
+    smart_scheduler.schedule_task_reminders_bulk(task_id, sample_user_id, [
+        (now + timedelta(hours=10), 'deadline'),
+        (now + timedelta(hours=1), 'time_based'),
+        (now + timedelta(hours=100), 'deadline'),
+    ])
+
+    # В БД - все три
+    assert len(temp_db.get_future_reminders(hours=200)) == 3
+
+    # В очереди - два ближайших, отсортированных по времени
+    assert len(smart_scheduler.reminder_queue) == 2
+    assert smart_scheduler.reminder_queue[0].type == 'time_based'
+    assert smart_scheduler.reminder_queue[0].title == sample_task_data['title']